@@ -48,6 +48,9 @@ INSTALLED_APPS = [
     'allauth.account',
     'allauth.socialaccount',
     'allauth.socialaccount.providers.google',
+
+    # ORM query caching for the course taxonomy
+    'cachalot',
 ]
 
 SITE_ID = 1
@@ -57,7 +60,9 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Django's AuthenticationMiddleware, also loading the UserProfile with
+    # the session user
+    'core.middleware.ProfileAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -204,21 +209,52 @@ SOCIALACCOUNT_PROVIDERS = {
 # Add Gemini API key
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 
-# Configure caching for AI responses
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',  # For development
-        'LOCATION': 'unique-snowflake',
+# Longest a Gemini request may hold a worker, in milliseconds; slower calls
+# fall back to the static hint or exact-match check
+GEMINI_TIMEOUT_MS = config('GEMINI_TIMEOUT_MS', default=5000, cast=int)
+
+# Configure caching for AI responses. Set REDIS_URL in production so every
+# worker process shares one cache (needs the redis package); without it each
+# process gets its own in-memory cache, which is only suitable for development.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',  # For development
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
 
-# For production, use Redis:
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-#         'LOCATION': 'redis://127.0.0.1:6379/1',
-#     }
-# }
+# True when the default cache is shared by every worker process. Code that
+# coordinates workers through the cache (cachalot's invalidation, the AI
+# generation locks) only works then.
+SHARED_CACHE = bool(REDIS_URL)
+
+# cachalot invalidates a table's cached queries by writing to the cache, so
+# on a per-process cache a write in one worker would leave every other
+# worker serving stale rows indefinitely. Only enable it on a shared cache.
+CACHALOT_ENABLED = SHARED_CACHE
+
+# Only cache queries on the course content and achievements, which rarely
+# change but are read on almost every page and admin list. cachalot
+# invalidates these automatically whenever one of the tables is written to.
+CACHALOT_ONLY_CACHABLE_TABLES = (
+    'core_course',
+    'core_section',
+    'core_unit',
+    'core_lesson',
+    'core_exercise',
+    'core_exercisechoice',
+    'core_achievement',
+)
 
 # Logging configuration to see AI calls
 LOGGING = {
@@ -1,26 +1,58 @@
 from django.contrib import admin
+from django.db.models import BooleanField, Case, Q, Value, When
 from .models import (
     Course, Section, Unit, Lesson, Exercise, ExerciseChoice,
     Attempt, LessonProgress, UserProfile, DailyQuest,
     UserDailyQuest, Achievement, UserAchievement
 )
 
+class ChangeListOnlyMixin:
+    """
+    Load only changelist_only_fields on the changelist page, so the paginated
+    list query skips columns it never renders. Change forms and actions keep
+    the full queryset.
+    """
+    changelist_only_fields = ()
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        match = request.resolver_match
+        opts = self.model._meta
+        if (
+            self.changelist_only_fields
+            and match is not None
+            and match.url_name == f"{opts.app_label}_{opts.model_name}_changelist"
+        ):
+            qs = qs.only(*self.changelist_only_fields)
+        return qs
+
 class ExerciseChoiceInline(admin.TabularInline):
     model = ExerciseChoice
     extra = 1
     fields = ("text", "is_correct", "image", "audio_file")
 
-class ExerciseAdmin(admin.ModelAdmin):
+class ExerciseAdmin(ChangeListOnlyMixin, admin.ModelAdmin):
     inlines = [ExerciseChoiceInline]
-    list_display = ("lesson", "order", "type", "prompt", "is_new_word", "has_audio")  # ← Add has_audio
+    list_display = ("lesson", "order", "type", "prompt", "is_new_word", "_has_audio")
     list_filter = ("type", "is_new_word")
+    list_select_related = ("lesson__unit__section__course",)
     search_fields = ("prompt", "answer_text")
-    
-    # Add this method
-    def has_audio(self, obj):
-        return bool(obj.audio_file)
-    has_audio.boolean = True
-    has_audio.short_description = "Audio"
+    # The audio flag is annotated, so audio_file itself is not needed
+    changelist_only_fields = ("lesson", "order", "type", "prompt", "is_new_word")
+
+    def get_queryset(self, request):
+        # Compute the audio flag in SQL instead of per row while rendering
+        return super().get_queryset(request).annotate(
+            _has_audio=Case(
+                When(Q(audio_file="") | Q(audio_file__isnull=True), then=Value(False)),
+                default=Value(True),
+                output_field=BooleanField(),
+            )
+        )
+
+    @admin.display(boolean=True, description="Audio", ordering="_has_audio")
+    def _has_audio(self, obj):
+        return obj._has_audio
 
 class UnitInline(admin.TabularInline):
     model = Unit
@@ -36,22 +68,27 @@ class SectionAdmin(admin.ModelAdmin):
     inlines = [UnitInline]
     list_display = ("course", "order", "title")
     list_filter = ("course",)
+    list_select_related = ("course",)
 
 class UnitAdmin(admin.ModelAdmin):
     inlines = [LessonInline]
     list_display = ("section", "order", "title")
     list_filter = ("section__course",)
+    list_select_related = ("section__course",)
 
 class LessonAdmin(admin.ModelAdmin):
     list_display = ("unit", "title", "order", "lesson_type", "is_locked")
     list_filter = ("unit__section__course", "lesson_type", "is_locked")
+    list_select_related = ("unit__section__course",)
     search_fields = ("title",)
 
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(ChangeListOnlyMixin, admin.ModelAdmin):
     list_display = ("user", "learning_language", "hearts", "gems", "xp", "streak_days", "has_selected_language")
     list_filter = ("learning_language", "has_selected_language")
+    list_select_related = ("user",)
+    changelist_only_fields = list_display
     search_fields = ("user__email", "user__username")
-    readonly_fields = ("created_at",)
+    readonly_fields = ("created_at", "completed_lessons_count", "completed_quests_count")
 
 class DailyQuestAdmin(admin.ModelAdmin):
     list_display = ("title", "quest_type", "target_value", "xp_reward", "gem_reward", "is_active")
@@ -60,6 +97,7 @@ class DailyQuestAdmin(admin.ModelAdmin):
 class UserDailyQuestAdmin(admin.ModelAdmin):
     list_display = ("user", "quest", "progress", "completed", "date_assigned")
     list_filter = ("completed", "date_assigned", "quest__quest_type")
+    list_select_related = ("user", "quest")
     search_fields = ("user__email", "user__username")
 
 class AchievementAdmin(admin.ModelAdmin):
@@ -68,11 +106,13 @@ class AchievementAdmin(admin.ModelAdmin):
 class UserAchievementAdmin(admin.ModelAdmin):
     list_display = ("user", "achievement", "earned_at")
     list_filter = ("earned_at", "achievement")
+    list_select_related = ("user", "achievement")
     search_fields = ("user__email", "user__username")
 
 class LessonProgressAdmin(admin.ModelAdmin):
     list_display = ("user", "lesson", "score", "completed", "last_seen")
     list_filter = ("completed", "lesson__unit__section__course")
+    list_select_related = ("user", "lesson__unit__section__course")
     search_fields = ("user__email", "user__username")
 
 # Register models
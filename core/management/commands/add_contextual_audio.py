@@ -1,11 +1,19 @@
 from django.core.management.base import BaseCommand
-from django.db.models import Max
+from django.db import transaction
+from django.db.models import Max, Prefetch
 from core.models import Lesson, Exercise, ExerciseChoice
-from gtts import gTTS
-import os
-from django.conf import settings
+from core.utils.audio import synthesize
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
 
+# Language code mapping for gTTS, keyed by course slug
+LANGUAGE_CODES = {
+    'spanish-to-english': 'es',
+    'chinese-to-english': 'zh-CN',
+    'zh-en-basics': 'zh-CN',
+    'french-to-english': 'fr',
+}
+
 
 class Command(BaseCommand):
     help = 'Add contextual audio exercises based on existing lesson content'
@@ -21,157 +29,180 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be added without actually adding',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Number of concurrent TTS requests',
+        )
 
     def handle(self, *args, **kwargs):
         lesson_id = kwargs.get('lesson')
         dry_run = kwargs.get('dry_run')
-
-        # Language code mapping for gTTS
-        language_codes = {
-            'spanish-to-english': 'es',
-            'chinese-to-english': 'zh-CN',
-            'zh-en-basics': 'zh-CN',
-            'french-to-english': 'fr',
-        }
+        workers = kwargs.get('workers')
 
         # Get lessons to process
         if lesson_id:
             lessons = Lesson.objects.filter(id=lesson_id)
         else:
             lessons = Lesson.objects.filter(
-                unit__section__course__slug__in=language_codes.keys()
+                unit__section__course__slug__in=list(LANGUAGE_CODES)
             )
+        lessons = lessons.select_related('unit__section__course').only(
+            'id', 'title', 'unit__section__course__slug'
+        ).prefetch_related(
+            Prefetch('exercises', queryset=Exercise.objects.prefetch_related('choices'))
+        ).annotate(_max_order=Max('exercises__order'))
 
         if not lessons.exists():
             self.stdout.write(self.style.WARNING('No lessons found'))
             return
 
-        # Ensure media directory exists
-        media_root = settings.MEDIA_ROOT
-        audio_dir = os.path.join(media_root, 'exercise_audio')
-        if not dry_run:
-            os.makedirs(audio_dir, exist_ok=True)
-
         added_count = 0
         skipped_count = 0
 
-        for lesson in lessons:
-            self.stdout.write(f'\n{"="*60}')
-            self.stdout.write(f'Analyzing Lesson: {lesson.title} (ID: {lesson.id})')
-            self.stdout.write(f'{"="*60}')
+        # TTS calls are network-bound, so each lesson's audio is synthesized
+        # concurrently. Database writes stay on this thread.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for lesson in lessons.iterator(chunk_size=100):
+                # This lesson's progress lines, written out in one go at the end
+                output = []
+                try:
+                    output.append(f'\n{"="*60}')
+                    output.append(f'Analyzing Lesson: {lesson.title} (ID: {lesson.id})')
+                    output.append(f'{"="*60}')
 
-            # Get course and language
-            course_slug = lesson.unit.section.course.slug if lesson.unit else ''
-            lang_code = language_codes.get(course_slug)
+                    # Get course and language
+                    course_slug = lesson.unit.section.course.slug if lesson.unit else ''
+                    lang_code = LANGUAGE_CODES.get(course_slug)
             
-            if not lang_code:
-                self.stdout.write(self.style.WARNING(
-                    f'Unknown language for course: {course_slug}'
-                ))
-                skipped_count += 1
-                continue
+                    if not lang_code:
+                        output.append(self.style.WARNING(
+                            f'Unknown language for course: {course_slug}'
+                        ))
+                        skipped_count += 1
+                        continue
 
-            # Analyze existing exercises in this lesson
-            existing_exercises = lesson.exercises.all()
+                    # Analyze existing exercises in this lesson
+                    existing_exercises = lesson.exercises.all()
             
-            # Extract vocabulary from existing exercises
-            vocabulary = self._extract_vocabulary(existing_exercises)
+                    # Extract vocabulary from existing exercises
+                    vocabulary = self._extract_vocabulary(existing_exercises)
             
-            self.stdout.write(f'Found {len(vocabulary)} vocabulary items:')
-            for item in vocabulary[:10]:  # Show first 10
-                self.stdout.write(f'  - {item["prompt"]} → {item["answer"]}')
-            if len(vocabulary) > 10:
-                self.stdout.write(f'  ... and {len(vocabulary) - 10} more')
+                    output.append(f'Found {len(vocabulary)} vocabulary items:')
+                    for item in vocabulary[:10]:  # Show first 10
+                        output.append(f'  - {item["prompt"]} → {item["answer"]}')
+                    if len(vocabulary) > 10:
+                        output.append(f'  ... and {len(vocabulary) - 10} more')
 
-            # Generate audio exercises based on lesson content
-            audio_exercises = self._generate_audio_exercises(
-                vocabulary, 
-                lang_code,
-                existing_exercises
-            )
+                    # Generate audio exercises based on lesson content
+                    audio_exercises = self._generate_audio_exercises(
+                        vocabulary, 
+                        lang_code,
+                        existing_exercises
+                    )
 
-            if not audio_exercises:
-                self.stdout.write(self.style.WARNING(
-                    'No suitable content found for audio exercises'
-                ))
-                skipped_count += 1
-                continue
+                    if not audio_exercises:
+                        output.append(self.style.WARNING(
+                            'No suitable content found for audio exercises'
+                        ))
+                        skipped_count += 1
+                        continue
 
-            # Get the highest order number for this lesson
-            max_order = existing_exercises.aggregate(
-                max_order=Max('order')
-            )['max_order'] or 0
+                    # Highest order number for this lesson, annotated on the queryset
+                    max_order = lesson._max_order or 0
 
-            # Add the generated exercises
-            for idx, ex_data in enumerate(audio_exercises, start=1):
-                if dry_run:
-                    self.stdout.write(self.style.SUCCESS(
-                        f'[DRY RUN] Would add {ex_data["type"]} exercise: "{ex_data["answer_text"]}"'
-                    ))
-                    if ex_data.get('word_bank'):
-                        self.stdout.write(f'  Word bank: {", ".join(ex_data["word_bank"])}')
-                    added_count += 1
-                    continue
+                    # Add the generated exercises
+                    # Answers that already have a listening exercise in this lesson
+                    candidates = []
+                    candidate_answers = {
+                        ex.answer_text for ex in existing_exercises
+                        if ex.type in [Exercise.LISTEN, Exercise.LISTEN_CONSTRUCT]
+                    }
+                    for idx, ex_data in enumerate(audio_exercises, start=1):
+                        if dry_run:
+                            output.append(self.style.SUCCESS(
+                                f'[DRY RUN] Would add {ex_data["type"]} exercise: "{ex_data["answer_text"]}"'
+                            ))
+                            if ex_data.get('word_bank'):
+                                output.append(f'  Word bank: {", ".join(ex_data["word_bank"])}')
+                            added_count += 1
+                            continue
 
-                # Check if similar exercise already exists
-                existing = lesson.exercises.filter(
-                    answer_text=ex_data['answer_text'],
-                    type__in=[Exercise.LISTEN, Exercise.LISTEN_CONSTRUCT]
-                ).first()
+                        # Check if similar exercise already exists
+                        if ex_data['answer_text'] in candidate_answers:
+                            output.append(self.style.WARNING(
+                                f'Skipping: Exercise with "{ex_data["answer_text"]}" already exists'
+                            ))
+                            skipped_count += 1
+                            continue
 
-                if existing:
-                    self.stdout.write(self.style.WARNING(
-                        f'Skipping: Exercise with "{ex_data["answer_text"]}" already exists'
-                    ))
-                    skipped_count += 1
-                    continue
+                        candidates.append((max_order + idx, ex_data))
+                        candidate_answers.add(ex_data['answer_text'])
 
-                # Create exercise
-                try:
-                    exercise = Exercise.objects.create(
-                        lesson=lesson,
-                        order=max_order + idx,
-                        type=ex_data['type'],
-                        prompt=ex_data['prompt'],
-                        answer_text=ex_data['answer_text'],
-                        hint=ex_data.get('hint', ''),
-                        is_new_word=ex_data.get('is_new_word', False),
-                    )
+                    # Generate audio files for the new exercises. Files are named by
+                    # their content, so the name is known before the exercise row
+                    # exists and text already spoken elsewhere is not synthesized again.
+                    futures = {
+                        executor.submit(synthesize, ex_data['answer_text'], lang_code): (order, ex_data)
+                        for order, ex_data in candidates
+                    }
 
-                    # Generate audio file
-                    filename = f'exercise_{exercise.id}.mp3'
-                    filepath = os.path.join(audio_dir, filename)
+                    synthesized = []
+                    for future in as_completed(futures):
+                        order, ex_data = futures[future]
+                        try:
+                            audio_file = future.result()
+                        except Exception as e:
+                            output.append(self.style.ERROR(
+                                f'✗ Error creating exercise: {str(e)}'
+                            ))
+                            skipped_count += 1
+                            continue
+                        synthesized.append((order, ex_data, audio_file))
 
-                    tts = gTTS(text=ex_data['answer_text'], lang=lang_code, slow=False)
-                    tts.save(filepath)
+                    if not synthesized:
+                        continue
 
-                    exercise.audio_file = f'exercise_audio/{filename}'
-                    exercise.save()
+                    # Insert the exercises with their audio already set, then all of
+                    # their word bank choices, in one statement each
+                    synthesized.sort(key=lambda item: item[0])
+                    with transaction.atomic():
+                        exercises = Exercise.objects.bulk_create([
+                            Exercise(
+                                lesson=lesson,
+                                order=order,
+                                type=ex_data['type'],
+                                prompt=ex_data['prompt'],
+                                answer_text=ex_data['answer_text'],
+                                hint=ex_data.get('hint', ''),
+                                is_new_word=ex_data.get('is_new_word', False),
+                                audio_file=audio_file,
+                            )
+                            for order, ex_data, audio_file in synthesized
+                        ])
 
-                    self.stdout.write(self.style.SUCCESS(
-                        f'✓ Added {ex_data["type"]} exercise: "{ex_data["answer_text"]}"'
-                    ))
-                    added_count += 1
+                        choices = []
+                        for exercise, (order, ex_data, audio_file) in zip(exercises, synthesized):
+                            output.append(self.style.SUCCESS(
+                                f'✓ Added {ex_data["type"]} exercise: "{ex_data["answer_text"]}"'
+                            ))
+                            added_count += 1
 
-                    # Create word bank choices if provided
-                    if ex_data.get('word_bank'):
-                        answer_words = ex_data['answer_text'].split()
-                        for word in ex_data['word_bank']:
-                            is_correct = word in answer_words
-                            ExerciseChoice.objects.create(
-                                exercise=exercise,
-                                text=word,
-                                is_correct=is_correct,
-                            )
-                        self.stdout.write(f'  Added word bank: {", ".join(ex_data["word_bank"])}')
+                            # Create word bank choices if provided
+                            if ex_data.get('word_bank'):
+                                answer_words = ex_data['answer_text'].split()
+                                for word in ex_data['word_bank']:
+                                    choices.append(ExerciseChoice(
+                                        exercise=exercise,
+                                        text=word,
+                                        is_correct=word in answer_words,
+                                    ))
+                                output.append(f'  Added word bank: {", ".join(ex_data["word_bank"])}')
 
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f'✗ Error creating exercise: {str(e)}'
-                    ))
-                    if not dry_run and 'exercise' in locals():
-                        exercise.delete()
-                    skipped_count += 1
+                        ExerciseChoice.objects.bulk_create(choices)
+                finally:
+                    self.stdout.write('\n'.join(output))
 
         # Summary
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
@@ -186,7 +217,8 @@ class Command(BaseCommand):
     def _extract_vocabulary(self, exercises):
         """
         Extract vocabulary from existing exercises in the lesson.
-        Returns list of dicts with prompt, answer, and metadata.
+        Returns list of dicts with prompt, answer (also split into
+        answer_tokens), and metadata.
         """
         vocabulary = []
         
@@ -200,6 +232,7 @@ class Command(BaseCommand):
                 vocabulary.append({
                     'prompt': ex.prompt,
                     'answer': ex.answer_text,
+                    'answer_tokens': tuple(ex.answer_text.split()),
                     'type': 'translate',
                     'hint': ex.hint,
                     'is_new_word': ex.is_new_word,
@@ -210,6 +243,7 @@ class Command(BaseCommand):
                 vocabulary.append({
                     'prompt': ex.prompt,
                     'answer': ex.answer_text,
+                    'answer_tokens': tuple(ex.answer_text.split()),
                     'type': 'multiple_choice',
                     'hint': ex.hint,
                     'is_new_word': ex.is_new_word,
@@ -244,28 +278,23 @@ class Command(BaseCommand):
         
         # Strategy 2: Create Listen & Construct for phrases/sentences
         # Look for multi-word answers (phrases or sentences)
-        phrases = [v for v in vocabulary if len(v['answer'].split()) >= 2]
+        phrases = [v for v in vocabulary if len(v['answer_tokens']) >= 2]
         
         if phrases:
             # Pick 1-2 phrases for word bank exercises
             selected_phrases = random.sample(phrases, min(2, len(phrases)))
+
+            # Unique words across the lesson vocabulary, used as distractors
+            all_unique_words = {w for v in vocabulary for w in v['answer_tokens']}
             
             for phrase_item in selected_phrases:
-                answer_words = phrase_item['answer'].split()
+                answer_words = phrase_item['answer_tokens']
                 
                 # Create word bank with correct words + distractors
-                word_bank = answer_words.copy()
-                
-                # Add distractors from other vocabulary in the lesson
-                all_words = []
-                for v in vocabulary:
-                    all_words.extend(v['answer'].split())
-                
-                # Remove duplicates and get unique words
-                unique_words = list(set(all_words))
+                word_bank = list(answer_words)
                 
-                # Add 2-4 distractor words
-                distractors = [w for w in unique_words if w not in answer_words]
+                # Add 2-4 distractor words from other vocabulary in the lesson
+                distractors = list(all_unique_words - set(answer_words))
                 word_bank.extend(random.sample(distractors, min(3, len(distractors))))
                 
                 # Shuffle word bank
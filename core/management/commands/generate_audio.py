@@ -1,9 +1,14 @@
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import transaction
 from core.models import Exercise, ExerciseChoice
-from gtts import gTTS
+from core.utils.audio import synthesize
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 
+# Rows fetched per database round trip and synthesized per batch
+CHUNK_SIZE = 500
+
 
 class Command(BaseCommand):
     help = 'Generate audio files for exercises using Google Text-to-Speech'
@@ -30,12 +35,19 @@ class Command(BaseCommand):
             action='store_true',
             help='Regenerate audio even if file already exists',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Number of concurrent TTS requests',
+        )
 
     def handle(self, *args, **kwargs):
         lesson_id = kwargs.get('lesson')
         exercise_id = kwargs.get('exercise')
         language = kwargs.get('language')
         regenerate = kwargs.get('regenerate')
+        workers = kwargs.get('workers')
 
         # Build query
         exercises = Exercise.objects.all()
@@ -50,63 +62,69 @@ class Command(BaseCommand):
 
         # Filter for exercises that need audio
         # Listen exercises and Listen & Construct exercises need audio
-        exercises = exercises.filter(type__in=[Exercise.LISTEN, Exercise.LISTEN_CONSTRUCT])
+        exercises = exercises.filter(
+            type__in=[Exercise.LISTEN, Exercise.LISTEN_CONSTRUCT]
+        ).only('id', 'audio_file', 'answer_text', 'prompt')
 
-        self.stdout.write(f'Found {exercises.count()} exercises to process')
-
-        # Ensure media directories exist
         media_root = settings.MEDIA_ROOT
-        audio_dir = os.path.join(media_root, 'exercise_audio')
-        os.makedirs(audio_dir, exist_ok=True)
 
         generated_count = 0
         skipped_count = 0
         error_count = 0
 
-        for exercise in exercises:
-            # Check if audio already exists
-            if exercise.audio_file and not regenerate:
-                audio_path = os.path.join(media_root, exercise.audio_file.name)
-                if os.path.exists(audio_path):
-                    self.stdout.write(self.style.WARNING(
-                        f'Skipping Exercise {exercise.id}: Audio already exists'
-                    ))
-                    skipped_count += 1
-                    continue
+        # TTS calls are network-bound, so run them concurrently. Exercises are
+        # streamed from the database and synthesized one chunk at a time so
+        # only CHUNK_SIZE model instances are held in memory.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Exercises that still need audio, as (exercise, text)
+            pending = []
+            # Progress lines, written out once per batch rather than per row
+            output = []
+
+            for exercise in exercises.iterator(chunk_size=CHUNK_SIZE):
+                # Check if audio already exists
+                if exercise.audio_file and not regenerate:
+                    audio_path = os.path.join(media_root, exercise.audio_file.name)
+                    if os.path.exists(audio_path):
+                        output.append(self.style.WARNING(
+                            f'Skipping Exercise {exercise.id}: Audio already exists'
+                        ))
+                        skipped_count += 1
+                        continue
 
-            try:
                 # Use answer_text for the audio (this is what they should hear)
                 text = exercise.answer_text or exercise.prompt
-                
+
                 if not text:
-                    self.stdout.write(self.style.WARNING(
+                    output.append(self.style.WARNING(
                         f'Skipping Exercise {exercise.id}: No text to convert'
                     ))
                     skipped_count += 1
                     continue
 
-                # Generate audio file
-                filename = f'exercise_{exercise.id}.mp3'
-                filepath = os.path.join(audio_dir, filename)
+                pending.append((exercise, text))
 
-                # Create TTS object and save
-                tts = gTTS(text=text, lang=language, slow=False)
-                tts.save(filepath)
+                if len(pending) >= CHUNK_SIZE:
+                    generated, errors = self._generate_batch(
+                        executor, pending, language, regenerate, output
+                    )
+                    generated_count += generated
+                    error_count += errors
+                    pending = []
 
-                # Update exercise with audio file path
-                exercise.audio_file = f'exercise_audio/{filename}'
-                exercise.save()
+                if len(output) >= CHUNK_SIZE:
+                    self.stdout.write('\n'.join(output))
+                    output = []
 
-                self.stdout.write(self.style.SUCCESS(
-                    f'✓ Generated audio for Exercise {exercise.id}: "{text[:50]}..."'
-                ))
-                generated_count += 1
+            if pending:
+                generated, errors = self._generate_batch(
+                    executor, pending, language, regenerate, output
+                )
+                generated_count += generated
+                error_count += errors
 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(
-                    f'✗ Error generating audio for Exercise {exercise.id}: {str(e)}'
-                ))
-                error_count += 1
+            if output:
+                self.stdout.write('\n'.join(output))
 
         # Summary
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
@@ -115,4 +133,55 @@ class Command(BaseCommand):
         self.stdout.write(f'Generated: {generated_count}')
         self.stdout.write(f'Skipped: {skipped_count}')
         self.stdout.write(f'Errors: {error_count}')
-        self.stdout.write(f'Total processed: {generated_count + skipped_count + error_count}')
\ No newline at end of file
+        self.stdout.write(f'Total processed: {generated_count + skipped_count + error_count}')
+
+    def _generate_batch(self, executor, pending, language, regenerate, output):
+        """
+        Synthesize audio for a batch of (exercise, text) tuples. Each distinct
+        text is synthesized once and its file shared by every exercise using
+        it. Database writes stay on this thread, which owns the connection.
+        Progress lines are appended to output. Returns a (generated, errors)
+        count pair.
+        """
+        generated_count = 0
+        error_count = 0
+
+        exercises_by_text = {}
+        for exercise, text in pending:
+            exercises_by_text.setdefault(text, []).append(exercise)
+
+        futures = {
+            executor.submit(synthesize, text, language, regenerate): text
+            for text in exercises_by_text
+        }
+
+        synthesized = []
+        for future in as_completed(futures):
+            text = futures[future]
+            try:
+                audio_file = future.result()
+            except Exception as e:
+                for exercise in exercises_by_text[text]:
+                    output.append(self.style.ERROR(
+                        f'✗ Error generating audio for Exercise {exercise.id}: {str(e)}'
+                    ))
+                    error_count += 1
+                continue
+
+            for exercise in exercises_by_text[text]:
+                # Update exercise with audio file path
+                exercise.audio_file = audio_file
+                synthesized.append(exercise)
+
+                output.append(self.style.SUCCESS(
+                    f'✓ Generated audio for Exercise {exercise.id}: "{text[:50]}..."'
+                ))
+                generated_count += 1
+
+        # Commit the whole batch at once, after the network calls are done so
+        # the transaction is never held open while waiting on TTS
+        with transaction.atomic():
+            for exercise in synthesized:
+                exercise.save(update_fields=['audio_file'])
+
+        return generated_count, error_count
@@ -1,93 +1,152 @@
 from django.core.management.base import BaseCommand
-from core.models import Course, Lesson, Exercise, ExerciseChoice
+from django.db import connection, transaction
+from core.models import (
+    Course, Section, Unit, Lesson, Exercise, ExerciseChoice,
+    Attempt, LessonProgress, UserProfile
+)
+
+# Every table under Course, children first so each can be emptied with a
+# plain DELETE without tripping foreign key checks
+CONTENT_MODELS = (
+    Attempt, LessonProgress, ExerciseChoice, Exercise, Lesson, Unit, Section, Course
+)
 
 
 class Command(BaseCommand):
     help = 'Populate the database with sample language learning data'
 
+    # All inserts commit together, and a failure leaves no half-seeded course
+    @transaction.atomic
     def handle(self, *args, **kwargs):
         self.stdout.write('Populating sample data...')
 
-        Course.objects.all().delete()
-
-        chinese_course = Course.objects.create(
-            title='Chinese to English (Basics)',
-            slug='zh-en-basics',
-            from_language='Chinese',
-            to_language='English',
-            description='Greetings and simple phrases.'
-        )
-
-        lesson1 = Lesson.objects.create(
-            course=chinese_course,
-            title='Greetings',
-            order=1
-        )
-
-        ex1 = Exercise.objects.create(
-            lesson=lesson1,
-            order=1,
-            type=Exercise.TRANSLATE,
-            prompt='你好',
-            answer_text='hello'
-        )
+        self._clear_content()
 
-        ex2 = Exercise.objects.create(
-            lesson=lesson1,
-            order=2,
-            type=Exercise.MULTIPLE_CHOICE,
-            prompt='谢谢',
-            answer_text='thank you'
-        )
-        ExerciseChoice.objects.create(exercise=ex2, text='goodbye', is_correct=False)
-        ExerciseChoice.objects.create(exercise=ex2, text='thank you', is_correct=True)
-        ExerciseChoice.objects.create(exercise=ex2, text='please', is_correct=False)
+        # Courses with their first lesson and its exercises
+        courses_data = [
+            {
+                'title': 'Chinese to English (Basics)',
+                'slug': 'zh-en-basics',
+                'from_language': 'Chinese',
+                'to_language': 'English',
+                'description': 'Greetings and simple phrases.',
+                'lesson': 'Greetings',
+                'exercises': [
+                    {
+                        'type': Exercise.TRANSLATE,
+                        'prompt': '你好',
+                        'answer_text': 'hello',
+                    },
+                    {
+                        'type': Exercise.MULTIPLE_CHOICE,
+                        'prompt': '谢谢',
+                        'answer_text': 'thank you',
+                        'choices': [
+                            {'text': 'goodbye', 'is_correct': False},
+                            {'text': 'thank you', 'is_correct': True},
+                            {'text': 'please', 'is_correct': False},
+                        ]
+                    },
+                ]
+            },
+            {
+                'title': 'Learn English from Spanish',
+                'slug': 'spanish-to-english',
+                'from_language': 'Spanish',
+                'to_language': 'English',
+                'description': 'Learn English essentials with lessons tailored for Spanish speakers.',
+                'lesson': 'Basic Greetings',
+                'exercises': [
+                    {
+                        'type': Exercise.TRANSLATE,
+                        'prompt': 'Hello',
+                        'answer_text': 'Hello',
+                    },
+                ]
+            },
+            {
+                'title': 'Learn English from French',
+                'slug': 'french-to-english',
+                'from_language': 'French',
+                'to_language': 'English',
+                'description': 'Comprehensive English lessons for French speakers at all levels.',
+                'lesson': 'Salutations',
+                'exercises': [
+                    {
+                        'type': Exercise.TRANSLATE,
+                        'prompt': 'Hello',
+                        'answer_text': 'Hello',
+                    },
+                ]
+            },
+        ]
 
-        spanish_course = Course.objects.create(
-            title='Learn English from Spanish',
-            slug='spanish-to-english',
-            from_language='Spanish',
-            to_language='English',
-            description='Learn English essentials with lessons tailored for Spanish speakers.'
-        )
+        # The tables were just cleared, so every level is a plain bulk insert
+        # and bulk_create sets the new primary keys on the instances
+        courses = Course.objects.bulk_create([
+            Course(
+                title=course_data['title'],
+                slug=course_data['slug'],
+                from_language=course_data['from_language'],
+                to_language=course_data['to_language'],
+                description=course_data['description'],
+            )
+            for course_data in courses_data
+        ])
 
-        es_lesson1 = Lesson.objects.create(
-            course=spanish_course,
-            title='Basic Greetings',
-            order=1
-        )
+        lessons = Lesson.objects.bulk_create([
+            Lesson(course=course, title=course_data['lesson'], order=1)
+            for course, course_data in zip(courses, courses_data)
+        ])
 
-        es_ex1 = Exercise.objects.create(
-            lesson=es_lesson1,
-            order=1,
-            type=Exercise.TRANSLATE,
-            prompt='Hello',
-            answer_text='Hello'
-        )
+        exercise_specs = [
+            (lesson, order, ex_data)
+            for lesson, course_data in zip(lessons, courses_data)
+            for order, ex_data in enumerate(course_data['exercises'], start=1)
+        ]
+        exercises = Exercise.objects.bulk_create([
+            Exercise(
+                lesson=lesson,
+                order=order,
+                type=ex_data['type'],
+                prompt=ex_data['prompt'],
+                answer_text=ex_data['answer_text'],
+            )
+            for lesson, order, ex_data in exercise_specs
+        ])
 
-        french_course = Course.objects.create(
-            title='Learn English from French',
-            slug='french-to-english',
-            from_language='French',
-            to_language='English',
-            description='Comprehensive English lessons for French speakers at all levels.'
-        )
-
-        fr_lesson1 = Lesson.objects.create(
-            course=french_course,
-            title='Salutations',
-            order=1
-        )
-
-        fr_ex1 = Exercise.objects.create(
-            lesson=fr_lesson1,
-            order=1,
-            type=Exercise.TRANSLATE,
-            prompt='Hello',
-            answer_text='Hello'
-        )
+        ExerciseChoice.objects.bulk_create([
+            ExerciseChoice(
+                exercise=exercise,
+                text=choice_data['text'],
+                is_correct=choice_data['is_correct'],
+            )
+            for exercise, (lesson, order, ex_data) in zip(exercises, exercise_specs)
+            for choice_data in ex_data.get('choices', [])
+        ])
 
         self.stdout.write(self.style.SUCCESS('Successfully populated sample data!'))
         self.stdout.write(f'Created {Course.objects.count()} courses')
         self.stdout.write(f'Created {Lesson.objects.count()} lessons')
         self.stdout.write(f'Created {Exercise.objects.count()} exercises')
+
+    def _clear_content(self):
+        """
+        Empty the course content tables. On PostgreSQL one TRUNCATE clears
+        them all; elsewhere each table is deleted in turn, children first.
+        """
+        if connection.vendor == 'postgresql':
+            tables = ', '.join(
+                connection.ops.quote_name(model._meta.db_table)
+                for model in CONTENT_MODELS
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+        else:
+            # Children are emptied first, so each delete finds nothing left
+            # to cascade into
+            for model in CONTENT_MODELS:
+                model.objects.all().delete()
+
+        # LessonProgress is gone, so nobody has completed a lesson any more
+        UserProfile.objects.update(completed_lessons_count=0)
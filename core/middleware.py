@@ -0,0 +1,62 @@
+# core/middleware.py
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model, load_backend,
+)
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+UserModel = get_user_model()
+
+
+def get_user(request):
+    """
+    The session user, loaded together with their UserProfile. Nearly every
+    page reads request.user.profile, which then needs no query of its own.
+    """
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = _get_profile_user(request) or auth.get_user(request)
+    return request._cached_user
+
+
+def _get_profile_user(request):
+    """
+    The session user with select_related('profile'), or None whenever the
+    session isn't one this can verify outright. Django's get_user then
+    handles those as usual: rotated secrets, flushing bad sessions and
+    anonymous visitors.
+    """
+    try:
+        user_id = UserModel._meta.pk.to_python(request.session[SESSION_KEY])
+        backend_path = request.session[BACKEND_SESSION_KEY]
+        session_hash = request.session[HASH_SESSION_KEY]
+    except KeyError:
+        return None
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+
+    # Both configured backends load users as ModelBackend does
+    backend = load_backend(backend_path)
+    if not isinstance(backend, ModelBackend):
+        return None
+    try:
+        user = UserModel._default_manager.select_related("profile").get(pk=user_id)
+    except UserModel.DoesNotExist:
+        return None
+    if not backend.user_can_authenticate(user):
+        return None
+    if not constant_time_compare(session_hash, user.get_session_auth_hash()):
+        return None
+
+    return user
+
+
+class ProfileAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware whose request.user comes with its profile."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-16 02:42
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_titles(apps, schema_editor):
+    """
+    Fold achievements sharing a title into the oldest one, moving the users
+    who earned a duplicate onto it, so the unique constraint can be added.
+    """
+    Achievement = apps.get_model('core', 'Achievement')
+    UserAchievement = apps.get_model('core', 'UserAchievement')
+
+    duplicated = (
+        Achievement.objects.values('title')
+        .annotate(n=Count('id')).filter(n__gt=1)
+        .values_list('title', flat=True)
+    )
+    for title in list(duplicated):
+        keep, *extra = Achievement.objects.filter(title=title).order_by('pk')
+        for user_achievement in UserAchievement.objects.filter(achievement__in=extra):
+            if UserAchievement.objects.filter(
+                user_id=user_achievement.user_id, achievement=keep
+            ).exists():
+                user_achievement.delete()
+            else:
+                user_achievement.achievement = keep
+                user_achievement.save(update_fields=['achievement'])
+        Achievement.objects.filter(pk__in=[a.pk for a in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    # The data step commits on its own first; PostgreSQL refuses to alter a
+    # table with foreign key checks still pending from the same transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_alter_userdailyquest_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_titles, migrations.RunPython.noop, atomic=True),
+        migrations.AlterField(
+            model_name='achievement',
+            name='title',
+            field=models.CharField(max_length=120, unique=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-16 02:46
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_listen_exercises(apps, schema_editor):
+    """
+    Keep the oldest listening exercise for each (lesson, answer_text, type)
+    and move the attempts on its duplicates onto it, so the unique
+    constraint can be added.
+    """
+    Exercise = apps.get_model('core', 'Exercise')
+    Attempt = apps.get_model('core', 'Attempt')
+
+    duplicated = (
+        Exercise.objects.filter(type__in=['LS', 'LC'])
+        .values('lesson', 'answer_text', 'type')
+        .annotate(n=Count('id')).filter(n__gt=1)
+    )
+    for group in list(duplicated):
+        keep, *extra = Exercise.objects.filter(
+            lesson=group['lesson'], answer_text=group['answer_text'], type=group['type']
+        ).order_by('pk')
+        # Their choices go with the duplicates, so drop the attempts' links
+        Attempt.objects.filter(exercise__in=extra).update(exercise=keep, selected_choice=None)
+        Exercise.objects.filter(pk__in=[e.pk for e in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    # The data step commits on its own first; PostgreSQL refuses to alter a
+    # table with foreign key checks still pending from the same transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_alter_achievement_title'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_listen_exercises, migrations.RunPython.noop, atomic=True),
+        migrations.AddConstraint(
+            model_name='exercise',
+            constraint=models.UniqueConstraint(condition=models.Q(('type__in', ['LS', 'LC'])), fields=('lesson', 'answer_text', 'type'), name='unique_listen_exercise_answer'),
+        ),
+    ]
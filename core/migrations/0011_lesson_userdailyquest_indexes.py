@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-16 02:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_exercise_unique_listen_exercise_answer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['unit', 'order'], name='core_lesson_unit_id_9b473d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdailyquest',
+            index=models.Index(fields=['user', 'date_assigned'], name='core_userda_user_id_1da15d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userdailyquest',
+            index=models.Index(fields=['completed', 'date_assigned'], name='core_userda_complet_0b9fb3_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-16 02:58
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def renumber_duplicate_orders(apps, schema_editor):
+    """
+    Give lessons sharing an order within a unit distinct orders, so the
+    unique constraint can be added. Lessons keep their relative position,
+    ties broken by creation, and each one is only moved as far down as
+    needed to clear the lesson before it.
+    """
+    Lesson = apps.get_model('core', 'Lesson')
+
+    units = (
+        Lesson.objects.filter(unit__isnull=False)
+        .values('unit', 'order')
+        .annotate(n=Count('id')).filter(n__gt=1)
+        .values_list('unit', flat=True)
+    )
+    for unit_id in set(units):
+        previous = 0
+        for lesson in Lesson.objects.filter(unit_id=unit_id).order_by('order', 'pk'):
+            order = max(lesson.order, previous + 1)
+            if order != lesson.order:
+                lesson.order = order
+                lesson.save(update_fields=['order'])
+            previous = order
+
+
+class Migration(migrations.Migration):
+
+    # The data step commits on its own first; PostgreSQL refuses to alter a
+    # table with foreign key checks still pending from the same transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_lesson_userdailyquest_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_orders, migrations.RunPython.noop, atomic=True),
+        migrations.AlterUniqueTogether(
+            name='lesson',
+            unique_together={('unit', 'order')},
+        ),
+        migrations.RemoveIndex(
+            model_name='lesson',
+            name='core_lesson_unit_id_9b473d_idx',
+        ),
+    ]
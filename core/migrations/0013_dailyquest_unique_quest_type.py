@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-16 03:00
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def merge_duplicate_quest_types(apps, schema_editor):
+    """
+    Fold quests sharing a quest_type into the oldest one, so the unique
+    constraint can be added. A user's rows for a duplicate move onto the
+    kept quest; where the user already has a row for the same day or week,
+    the two are merged, keeping the higher progress.
+    """
+    DailyQuest = apps.get_model('core', 'DailyQuest')
+    UserDailyQuest = apps.get_model('core', 'UserDailyQuest')
+
+    duplicated = (
+        DailyQuest.objects.values('quest_type')
+        .annotate(n=Count('id')).filter(n__gt=1)
+        .values_list('quest_type', flat=True)
+    )
+    for quest_type in list(duplicated):
+        keep, *extra = DailyQuest.objects.filter(quest_type=quest_type).order_by('pk')
+        for user_quest in UserDailyQuest.objects.filter(quest__in=extra).order_by('pk'):
+            same_period = Q(date_assigned=user_quest.date_assigned)
+            if user_quest.week_assigned is not None and user_quest.year_assigned is not None:
+                same_period |= Q(
+                    week_assigned=user_quest.week_assigned,
+                    year_assigned=user_quest.year_assigned,
+                )
+            existing = UserDailyQuest.objects.filter(
+                same_period, user_id=user_quest.user_id, quest=keep
+            ).first()
+            if existing:
+                existing.progress = max(existing.progress, user_quest.progress)
+                existing.completed = existing.completed or user_quest.completed
+                existing.save(update_fields=['progress', 'completed'])
+                user_quest.delete()
+            else:
+                user_quest.quest = keep
+                user_quest.save(update_fields=['quest'])
+        DailyQuest.objects.filter(pk__in=[q.pk for q in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    # The data step commits on its own first; PostgreSQL refuses to alter a
+    # table with foreign key checks still pending from the same transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_lesson_unique_unit_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_quest_types, migrations.RunPython.noop, atomic=True),
+        migrations.AlterField(
+            model_name='dailyquest',
+            name='quest_type',
+            field=models.CharField(choices=[('earn_xp', 'Earn XP'), ('complete_lessons', 'Complete Lessons'), ('perfect_lesson', 'Get a Perfect Lesson'), ('use_no_hearts', 'Complete without losing hearts'), ('weekly_warrior', 'Weekly Warrior'), ('streak_master', 'Streak Master')], max_length=20, unique=True),
+        ),
+    ]
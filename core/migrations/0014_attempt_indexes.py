@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-16 03:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_dailyquest_unique_quest_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['user', 'created_at'], name='core_attemp_user_id_9e3b7d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['user', 'exercise'], name='core_attemp_user_id_770b95_idx'),
+        ),
+    ]
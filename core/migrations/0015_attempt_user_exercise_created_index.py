@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-16 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_attempt_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['user', 'exercise', 'created_at'], name='core_attemp_user_id_d34fe8_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='attempt',
+            name='core_attemp_user_id_770b95_idx',
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.3 on 2026-10-16 03:23
+
+from django.db import migrations, models
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
+
+
+def _count(queryset):
+    return Subquery(
+        queryset.order_by().annotate(n=Func(F('pk'), function='COUNT')).values('n'),
+        output_field=IntegerField(),
+    )
+
+
+def backfill_counts(apps, schema_editor):
+    """Start the counters from the rows already completed."""
+    UserProfile = apps.get_model('core', 'UserProfile')
+    LessonProgress = apps.get_model('core', 'LessonProgress')
+    UserDailyQuest = apps.get_model('core', 'UserDailyQuest')
+    UserProfile.objects.update(
+        completed_lessons_count=_count(
+            LessonProgress.objects.filter(user=OuterRef('user'), completed=True)
+        ),
+        completed_quests_count=_count(
+            UserDailyQuest.objects.filter(user=OuterRef('user'), completed=True)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_attempt_user_exercise_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='completed_lessons_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='completed_quests_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
@@ -65,6 +66,7 @@ class Lesson(models.Model):
 
     class Meta:
         ordering = ["order"]
+        unique_together = [("unit", "order")]
 
     def __str__(self):
         if self.unit:
@@ -109,6 +111,14 @@ class Exercise(models.Model):
     class Meta:
         ordering = ["lesson", "order"]
         unique_together = [("lesson", "order")]
+        constraints = [
+            # Generated listening exercises are keyed by their answer text
+            models.UniqueConstraint(
+                fields=["lesson", "answer_text", "type"],
+                condition=models.Q(type__in=["LS", "LC"]),
+                name="unique_listen_exercise_answer",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.lesson} | {self.get_type_display()} #{self.order}"
@@ -137,6 +147,10 @@ class Attempt(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["user", "exercise", "created_at"]),
+        ]
 
 class LessonProgress(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -172,54 +186,94 @@ class UserProfile(models.Model):
     last_active_date = models.DateField(null=True, blank=True)
     last_heart_restore = models.DateTimeField(null=True, blank=True, help_text="Last time hearts were restored to maximum")
 
+    # Running totals, bumped where a lesson or quest first completes, so
+    # achievement checks and lesson gates don't count the rows every time
+    completed_lessons_count = models.IntegerField(default=0)
+    completed_quests_count = models.IntegerField(default=0)
+
     def __str__(self):
         return f"{self.user} - Learning: {self.get_learning_language_display() if self.learning_language else 'Not selected'}"
 
     def lose_heart(self):
         """Deduct one heart, minimum 0"""
+        # Counters change with a single UPDATE relative to the stored value,
+        # so concurrent requests can't overwrite each other's changes
+        UserProfile.objects.filter(pk=self.pk, hearts__gt=0).update(hearts=F("hearts") - 1)
         if self.hearts > 0:
             self.hearts -= 1
-            self.save()
 
     def restore_hearts(self):
         """Restore hearts to maximum and update restore timestamp"""
         self.hearts = self.max_hearts
         self.last_heart_restore = timezone.now()
-        self.save()
+        self.save(update_fields=["hearts", "last_heart_restore"])
 
     def add_xp(self, amount):
         """Add XP to the user's profile"""
+        UserProfile.objects.filter(pk=self.pk).update(xp=F("xp") + amount)
         self.xp += amount
-        self.save()
 
     def add_gems(self, amount):
         """Add gems to the user's profile"""
+        UserProfile.objects.filter(pk=self.pk).update(gems=F("gems") + amount)
         self.gems += amount
-        self.save()
+
+    def spend_gems(self, amount):
+        """
+        Take amount gems if the stored balance covers it. Returns whether
+        they were spent; the check and the deduction are one UPDATE, so
+        concurrent purchases can't take the balance below zero.
+        """
+        spent = UserProfile.objects.filter(pk=self.pk, gems__gte=amount).update(
+            gems=F("gems") - amount
+        )
+        if spent:
+            self.gems -= amount
+        return bool(spent)
+
+    def add_rewards(self, xp=0, gems=0, completed_lessons=0, completed_quests=0):
+        """Add XP, gems and completion counts to the user's profile in a single UPDATE"""
+        UserProfile.objects.filter(pk=self.pk).update(
+            xp=F("xp") + xp,
+            gems=F("gems") + gems,
+            completed_lessons_count=F("completed_lessons_count") + completed_lessons,
+            completed_quests_count=F("completed_quests_count") + completed_quests,
+        )
+        self.xp += xp
+        self.gems += gems
+        self.completed_lessons_count += completed_lessons
+        self.completed_quests_count += completed_quests
 
     def update_streak(self):
         """Update streak based on last active date"""
         from datetime import date, timedelta
 
         today = date.today()
+        yesterday = today - timedelta(days=1)
 
-        if self.last_active_date is None:
-            # First time activity
-            self.streak_days = 1
-            self.last_active_date = today
-        elif self.last_active_date == today:
+        if self.last_active_date == today:
             # Already active today, no change
-            pass
-        elif self.last_active_date == today - timedelta(days=1):
-            # Active yesterday, increment streak
+            return
+
+        # Branch on the stored date in the UPDATE itself, so a concurrent
+        # request that already counted today can't extend the streak twice
+        UserProfile.objects.filter(pk=self.pk).update(
+            streak_days=Case(
+                # Already active today, no change
+                When(last_active_date=today, then=F("streak_days")),
+                # Active yesterday, increment streak
+                When(last_active_date=yesterday, then=F("streak_days") + 1),
+                # First time activity, or streak broken: reset to 1
+                default=Value(1),
+            ),
+            last_active_date=today,
+        )
+
+        if self.last_active_date == yesterday:
             self.streak_days += 1
-            self.last_active_date = today
         else:
-            # Streak broken, reset to 1
             self.streak_days = 1
-            self.last_active_date = today
-
-        self.save()
+        self.last_active_date = today
 
 class DailyQuest(models.Model):
     EARN_XP = "earn_xp"
@@ -241,7 +295,7 @@ class DailyQuest(models.Model):
     # Add new field to distinguish daily vs weekly
     is_weekly = models.BooleanField(default=False)  # NEW
 
-    quest_type = models.CharField(max_length=20, choices=QUEST_TYPE_CHOICES)
+    quest_type = models.CharField(max_length=20, choices=QUEST_TYPE_CHOICES, unique=True)
     title = models.CharField(max_length=120)
     description = models.TextField()
     target_value = models.IntegerField(default=10)
@@ -267,17 +321,18 @@ class UserDailyQuest(models.Model):
     class Meta:
         unique_together = [("user", "quest", "date_assigned"), 
                           ("user", "quest", "week_assigned", "year_assigned")]
+        indexes = [
+            models.Index(fields=["user", "date_assigned"]),
+            models.Index(fields=["completed", "date_assigned"]),
+        ]
     
     def award_rewards(self):
         """Award XP and gems when quest is completed"""
         if self.completed and self.quest:
-            # Award XP
-            if self.quest.xp_reward > 0:
-                self.user.profile.add_xp(self.quest.xp_reward)
-            
-            # Award Gems
-            if self.quest.gem_reward > 0:
-                self.user.profile.add_gems(self.quest.gem_reward)
+            # Award XP and gems, and count the completed quest
+            self.user.profile.add_rewards(
+                xp=self.quest.xp_reward, gems=self.quest.gem_reward, completed_quests=1
+            )
             
             self.save()
     
@@ -290,8 +345,42 @@ class UserDailyQuest(models.Model):
             self.award_rewards()
         self.save()
 
+    @classmethod
+    def bulk_increment(cls, user, increments, **assigned):
+        """
+        Add progress to the user's quests in one UPDATE, then complete and
+        reward the ones that reached their target. increments maps quest
+        types to the amount to add. assigned picks the day
+        (date_assigned=...) or week (week_assigned=..., year_assigned=...)
+        the quests belong to.
+        """
+        quests = cls.objects.filter(user=user, quest__quest_type__in=increments, **assigned)
+        progress = Case(
+            *[
+                When(quest__in=DailyQuest.objects.filter(quest_type=quest_type), then=Value(increment))
+                for quest_type, increment in increments.items()
+            ],
+            default=Value(0),
+        )
+        if not quests.update(progress=F("progress") + progress):
+            return
+
+        reached = quests.filter(
+            completed=False, progress__gte=F("quest__target_value")
+        ).select_related("quest")
+        xp_reward = gem_reward = completed = 0
+        for user_quest in reached:
+            # Only the request that flips completed pays out the rewards
+            if cls.objects.filter(pk=user_quest.pk, completed=False).update(completed=True):
+                xp_reward += user_quest.quest.xp_reward
+                gem_reward += user_quest.quest.gem_reward
+                completed += 1
+
+        if completed:
+            user.profile.add_rewards(xp=xp_reward, gems=gem_reward, completed_quests=completed)
+
 class Achievement(models.Model):
-    title = models.CharField(max_length=120)
+    title = models.CharField(max_length=120, unique=True)
     description = models.TextField()
     icon = models.CharField(max_length=50, default="🏆")
     xp_reward = models.IntegerField(default=50)
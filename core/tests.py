@@ -1,3 +1,263 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+
+from .models import (
+    Course, Section, Unit, Lesson, Exercise, ExerciseChoice, LessonProgress,
+    UserProfile, DailyQuest, UserDailyQuest, Achievement, UserAchievement,
+)
+from .middleware import get_user
+from .utils.achievements import award_achievements
+from .utils.seed import seed_outline
+from .views import finalize_lesson
+
+
+class ProfileAuthenticationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("learner", "learner@example.com", "pw")
+        self.profile = UserProfile.objects.create(user=self.user)
+
+    def session_request(self):
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        return request
+
+    def test_session_user_comes_with_profile(self):
+        self.client.force_login(
+            self.user, backend="allauth.account.auth_backends.AuthenticationBackend"
+        )
+        request = self.session_request()
+        request.session.keys()  # load the session up front
+
+        with self.assertNumQueries(1):
+            user = get_user(request)
+            self.assertEqual(user, self.user)
+            self.assertEqual(user.profile, self.profile)
+
+    def test_session_with_a_stale_password_hash_is_anonymous(self):
+        self.client.force_login(self.user)
+        self.user.set_password("changed")
+        self.user.save()
+
+        self.assertFalse(get_user(self.session_request()).is_authenticated)
+
+    def test_anonymous_session(self):
+        self.assertFalse(get_user(self.session_request()).is_authenticated)
+
+
+class UserProfileCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("learner", "learner@example.com", "pw")
+        self.profile = UserProfile.objects.create(user=self.user, hearts=1, gems=10)
+
+    def test_lose_heart_stops_at_zero(self):
+        self.profile.lose_heart()
+        self.profile.lose_heart()
+
+        self.assertEqual(self.profile.hearts, 0)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.hearts, 0)
+
+    def test_add_rewards_adds_to_the_stored_values(self):
+        # A stale copy must not overwrite rewards paid through another one
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+        self.profile.add_rewards(xp=5, gems=2, completed_lessons=1)
+        stale.add_rewards(xp=7, completed_quests=1)
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.xp, 12)
+        self.assertEqual(self.profile.gems, 12)
+        self.assertEqual(self.profile.completed_lessons_count, 1)
+        self.assertEqual(self.profile.completed_quests_count, 1)
+
+    def test_spend_gems_checks_the_stored_balance(self):
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+        self.assertTrue(self.profile.spend_gems(8))
+        self.assertFalse(stale.spend_gems(8))
+
+        self.assertEqual(stale.gems, 10)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.gems, 2)
+
+
+class BulkIncrementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("learner", "learner@example.com", "pw")
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.today = date.today()
+        self.lessons_quest = UserDailyQuest.objects.create(
+            user=self.user,
+            quest=DailyQuest.objects.create(
+                quest_type=DailyQuest.COMPLETE_LESSONS, title="Lessons",
+                description="", target_value=2, xp_reward=10, gem_reward=5,
+            ),
+            date_assigned=self.today,
+        )
+        self.xp_quest = UserDailyQuest.objects.create(
+            user=self.user,
+            quest=DailyQuest.objects.create(
+                quest_type=DailyQuest.EARN_XP, title="XP",
+                description="", target_value=100, xp_reward=10,
+            ),
+            date_assigned=self.today,
+        )
+
+    def increment(self, increments):
+        UserDailyQuest.bulk_increment(self.user, increments, date_assigned=self.today)
+        self.lessons_quest.refresh_from_db()
+        self.xp_quest.refresh_from_db()
+        self.profile.refresh_from_db()
+
+    def test_progress_is_added_per_quest_type(self):
+        self.increment({DailyQuest.COMPLETE_LESSONS: 1, DailyQuest.EARN_XP: 30})
+
+        self.assertEqual(self.lessons_quest.progress, 1)
+        self.assertEqual(self.xp_quest.progress, 30)
+        self.assertFalse(self.lessons_quest.completed)
+        self.assertEqual(self.profile.xp, 0)
+        self.assertEqual(self.profile.completed_quests_count, 0)
+
+    def test_reaching_the_target_completes_and_rewards_once(self):
+        self.increment({DailyQuest.COMPLETE_LESSONS: 2, DailyQuest.EARN_XP: 30})
+
+        self.assertTrue(self.lessons_quest.completed)
+        self.assertFalse(self.xp_quest.completed)
+        self.assertEqual(self.profile.xp, 10)
+        self.assertEqual(self.profile.gems, 5)
+        self.assertEqual(self.profile.completed_quests_count, 1)
+
+        # Further progress on a completed quest pays nothing more
+        self.increment({DailyQuest.COMPLETE_LESSONS: 1})
+
+        self.assertEqual(self.lessons_quest.progress, 3)
+        self.assertEqual(self.profile.xp, 10)
+        self.assertEqual(self.profile.gems, 5)
+        self.assertEqual(self.profile.completed_quests_count, 1)
+
+    def test_other_days_are_left_alone(self):
+        UserDailyQuest.bulk_increment(
+            self.user, {DailyQuest.COMPLETE_LESSONS: 2}, date_assigned=date(2000, 1, 1)
+        )
+
+        self.lessons_quest.refresh_from_db()
+        self.assertEqual(self.lessons_quest.progress, 0)
+        self.assertFalse(self.lessons_quest.completed)
+
+
+class AwardAchievementsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("learner", "learner@example.com", "pw")
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.first = Achievement.objects.create(
+            title="First Steps", description="", xp_reward=50, gem_reward=10
+        )
+        self.second = Achievement.objects.create(
+            title="Scholar", description="", xp_reward=30, gem_reward=5
+        )
+
+    def test_rewards_are_paid_for_each_new_achievement(self):
+        awarded = award_achievements(self.user, [self.first, self.second, self.first])
+
+        self.assertEqual(len(awarded), 2)
+        self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 2)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.xp, 80)
+        self.assertEqual(self.profile.gems, 15)
+
+    def test_queries_do_not_grow_with_the_achievements(self):
+        others = [
+            Achievement.objects.create(title=f"Other {n}", description="")
+            for n in range(5)
+        ]
+
+        # INSERT, SELECT of the inserted rows and reward UPDATE, in a savepoint
+        with self.assertNumQueries(5):
+            award_achievements(self.user, [self.first, self.second, *others])
+
+    def test_already_earned_achievements_pay_nothing(self):
+        UserAchievement.objects.create(user=self.user, achievement=self.first)
+
+        awarded = award_achievements(self.user, [self.first, self.second])
+
+        self.assertEqual([ua.achievement for ua in awarded], [self.second])
+        self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 2)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.xp, 30)
+        self.assertEqual(self.profile.gems, 5)
+
+
+class SeedOutlineTests(TestCase):
+    def outline(self, title):
+        return [{
+            'order': 1, 'title': 'Section', 'description': '',
+            'units': [{
+                'order': 1, 'title': 'Unit', 'description': '',
+                'lessons': [{
+                    'order': 1, 'title': title,
+                    'lesson_type': Lesson.LESSON, 'is_locked': False,
+                    'exercises': [{
+                        'order': 1, 'type': Exercise.MULTIPLE_CHOICE,
+                        'prompt': 'the boy', 'answer_text': 'el niño',
+                        'choices': [
+                            {'text': 'el niño', 'is_correct': True},
+                            {'text': 'la niña', 'is_correct': False},
+                        ],
+                    }],
+                }],
+            }],
+        }]
+
+    def test_rerun_updates_rows_in_place(self):
+        course = Course.objects.create(title="Course", slug="course")
+        seed_outline(course, self.outline("Basics"))
+        seed_outline(course, self.outline("Basics 1"))
+
+        self.assertEqual(Section.objects.count(), 1)
+        self.assertEqual(Unit.objects.count(), 1)
+        self.assertEqual(list(Lesson.objects.values_list('title', flat=True)), ["Basics 1"])
+        self.assertEqual(Exercise.objects.count(), 1)
+        self.assertEqual(ExerciseChoice.objects.count(), 2)
+
+
+class FinalizeLessonTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(title="Course", slug="course")
+        section = Section.objects.create(course=course, title="Section")
+        unit = Unit.objects.create(section=section, title="Unit")
+        self.lesson = Lesson.objects.create(unit=unit, title="Lesson")
+        self.user = User.objects.create_user("learner", "learner@example.com", "pw")
+        self.profile = UserProfile.objects.create(user=self.user)
+
+    def test_first_completion_is_counted_and_rewarded(self):
+        xp = finalize_lesson(self.user, self.profile, self.lesson, score=3, perfect=False)
+
+        self.assertEqual(xp, 20)
+        progress = LessonProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertTrue(progress.completed)
+        self.assertEqual(progress.score, 3)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.completed_lessons_count, 1)
+        self.assertEqual(self.profile.xp, 20)
+
+    def test_double_submit_counts_the_lesson_once(self):
+        finalize_lesson(self.user, self.profile, self.lesson, score=3, perfect=False)
+        xp = finalize_lesson(self.user, self.profile, self.lesson, score=3, perfect=False)
+
+        self.assertEqual(xp, 0)
+        self.assertEqual(LessonProgress.objects.filter(user=self.user).count(), 1)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.completed_lessons_count, 1)
+        self.assertEqual(self.profile.xp, 20)
+
+    def test_incomplete_progress_row_is_completed_and_counted(self):
+        LessonProgress.objects.create(user=self.user, lesson=self.lesson, completed=False)
+
+        xp = finalize_lesson(self.user, self.profile, self.lesson, score=5, perfect=False)
+
+        self.assertEqual(xp, 20)
+        progress = LessonProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertTrue(progress.completed)
+        self.assertEqual(progress.score, 5)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.completed_lessons_count, 1)
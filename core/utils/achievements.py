@@ -1,6 +1,8 @@
 # core/utils/achievements.py
+from django.db import transaction
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
 from django.utils import timezone
-from core.models import Achievement, UserAchievement, LessonProgress, UserDailyQuest
+from core.models import Achievement, UserAchievement, UserProfile
 from datetime import time
 
 
@@ -10,55 +12,60 @@ def check_and_award_achievements(user, achievement_type=None):
     
     Args:
         user: The user to check achievements for
-        achievement_type: Optional specific type to check (e.g., 'lesson', 'streak', 'xp')
+        achievement_type: Optional specific type to check (e.g., 'lesson', 'streak', 'xp'),
+            or a list of types to check together
     
     Returns:
         List of newly earned achievements
     """
-    newly_earned = []
+    if isinstance(achievement_type, str):
+        achievement_type = [achievement_type]
+    
+    reached = []
     
     # Get user profile
     profile = user.profile
     
-    # Get already earned achievements to avoid duplicates
-    earned_achievement_ids = UserAchievement.objects.filter(
-        user=user
-    ).values_list('achievement_id', flat=True)
+    # Get already earned achievements to avoid duplicates, as a set so each
+    # checker's membership tests are hash lookups
+    earned_achievement_ids = set(
+        UserAchievement.objects.filter(
+            user=user
+        ).values_list('achievement_id', flat=True)
+    )
     
     # Check different achievement types
-    if achievement_type is None or achievement_type == 'lesson':
-        newly_earned.extend(check_lesson_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'lesson' in achievement_type:
+        reached.extend(check_lesson_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'streak':
-        newly_earned.extend(check_streak_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'streak' in achievement_type:
+        reached.extend(check_streak_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'xp':
-        newly_earned.extend(check_xp_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'xp' in achievement_type:
+        reached.extend(check_xp_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'perfect':
-        newly_earned.extend(check_perfect_lesson_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'perfect' in achievement_type:
+        reached.extend(check_perfect_lesson_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'quest':
-        newly_earned.extend(check_quest_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'quest' in achievement_type:
+        reached.extend(check_quest_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'time':
-        newly_earned.extend(check_time_based_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'time' in achievement_type:
+        reached.extend(check_time_based_achievements(user, profile, earned_achievement_ids))
     
-    if achievement_type is None or achievement_type == 'gems':
-        newly_earned.extend(check_gem_achievements(user, profile, earned_achievement_ids))
+    if achievement_type is None or 'gems' in achievement_type:
+        reached.extend(check_gem_achievements(user, profile, earned_achievement_ids))
     
-    return newly_earned
+    # Record everything the checks reached together
+    return award_achievements(user, reached)
 
 
 def check_lesson_achievements(user, profile, earned_achievement_ids):
     """Check lesson completion achievements"""
     newly_earned = []
     
-    # Count completed lessons
-    completed_count = LessonProgress.objects.filter(
-        user=user,
-        completed=True
-    ).count()
+    # Completed lessons, counted on the profile as they complete
+    completed_count = profile.completed_lessons_count
     
     # Define lesson milestones
     milestones = {
@@ -68,13 +75,11 @@ def check_lesson_achievements(user, profile, earned_achievement_ids):
         'Lesson Master': 25,
     }
     
-    for title, required_count in milestones.items():
-        if completed_count >= required_count:
-            achievement = Achievement.objects.filter(title=title).first()
-            if achievement and achievement.id not in earned_achievement_ids:
-                user_achievement = award_achievement(user, achievement)
-                if user_achievement:
-                    newly_earned.append(user_achievement)
+    reached = [
+        title for title, required_count in milestones.items()
+        if completed_count >= required_count
+    ]
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     return newly_earned
 
@@ -94,13 +99,11 @@ def check_streak_achievements(user, profile, earned_achievement_ids):
         'Legendary Streak': 100,
     }
     
-    for title, required_days in milestones.items():
-        if streak_days >= required_days:
-            achievement = Achievement.objects.filter(title=title).first()
-            if achievement and achievement.id not in earned_achievement_ids:
-                user_achievement = award_achievement(user, achievement)
-                if user_achievement:
-                    newly_earned.append(user_achievement)
+    reached = [
+        title for title, required_days in milestones.items()
+        if streak_days >= required_days
+    ]
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     return newly_earned
 
@@ -119,13 +122,11 @@ def check_xp_achievements(user, profile, earned_achievement_ids):
         'XP Legend': 5000,
     }
     
-    for title, required_xp in milestones.items():
-        if total_xp >= required_xp:
-            achievement = Achievement.objects.filter(title=title).first()
-            if achievement and achievement.id not in earned_achievement_ids:
-                user_achievement = award_achievement(user, achievement)
-                if user_achievement:
-                    newly_earned.append(user_achievement)
+    reached = [
+        title for title, required_xp in milestones.items()
+        if total_xp >= required_xp
+    ]
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     return newly_earned
 
@@ -148,11 +149,8 @@ def check_quest_achievements(user, profile, earned_achievement_ids):
     """Check quest completion achievements"""
     newly_earned = []
     
-    # Count completed quests
-    completed_quests = UserDailyQuest.objects.filter(
-        user=user,
-        completed=True
-    ).count()
+    # Completed quests, counted on the profile as they complete
+    completed_quests = profile.completed_quests_count
     
     # Define quest milestones
     milestones = {
@@ -161,13 +159,11 @@ def check_quest_achievements(user, profile, earned_achievement_ids):
         'Quest Master': 25,
     }
     
-    for title, required_count in milestones.items():
-        if completed_quests >= required_count:
-            achievement = Achievement.objects.filter(title=title).first()
-            if achievement and achievement.id not in earned_achievement_ids:
-                user_achievement = award_achievement(user, achievement)
-                if user_achievement:
-                    newly_earned.append(user_achievement)
+    reached = [
+        title for title, required_count in milestones.items()
+        if completed_quests >= required_count
+    ]
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     return newly_earned
 
@@ -180,21 +176,17 @@ def check_time_based_achievements(user, profile, earned_achievement_ids):
     now = timezone.now()
     current_time = now.time()
     
+    reached = []
+    
     # Check for Early Bird (before 8 AM)
     if current_time < time(8, 0):
-        achievement = Achievement.objects.filter(title='Early Bird').first()
-        if achievement and achievement.id not in earned_achievement_ids:
-            user_achievement = award_achievement(user, achievement)
-            if user_achievement:
-                newly_earned.append(user_achievement)
+        reached.append('Early Bird')
     
     # Check for Night Owl (after 10 PM)
     if current_time >= time(22, 0):
-        achievement = Achievement.objects.filter(title='Night Owl').first()
-        if achievement and achievement.id not in earned_achievement_ids:
-            user_achievement = award_achievement(user, achievement)
-            if user_achievement:
-                newly_earned.append(user_achievement)
+        reached.append('Night Owl')
+    
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     # Check for Weekend Warrior
     if now.weekday() in [5, 6]:  # Saturday or Sunday
@@ -217,17 +209,79 @@ def check_gem_achievements(user, profile, earned_achievement_ids):
         'Treasure Hunter': 500,
     }
     
-    for title, required_gems in milestones.items():
-        if total_gems >= required_gems:
-            achievement = Achievement.objects.filter(title=title).first()
-            if achievement and achievement.id not in earned_achievement_ids:
-                user_achievement = award_achievement(user, achievement)
-                if user_achievement:
-                    newly_earned.append(user_achievement)
+    reached = [
+        title for title, required_gems in milestones.items()
+        if total_gems >= required_gems
+    ]
+    newly_earned.extend(find_unearned_achievements(reached, earned_achievement_ids))
     
     return newly_earned
 
 
+def find_unearned_achievements(titles, earned_achievement_ids):
+    """
+    Fetch the achievements named in titles, in one query, leaving out the
+    ones the user has already earned.
+    
+    Returns:
+        List of Achievement objects, in the order of titles
+    """
+    if not titles:
+        return []
+    
+    achievements = Achievement.objects.in_bulk(titles, field_name='title')
+    return [
+        achievements[title] for title in titles
+        if title in achievements and achievements[title].id not in earned_achievement_ids
+    ]
+
+
+def award_achievements(user, achievements):
+    """
+    Award achievements to a user and give them the rewards, recording them
+    with one INSERT and paying all the XP and gems in one UPDATE. Callers
+    pass only achievements the user hasn't earned yet, as
+    find_unearned_achievements returns them.
+    
+    Returns:
+        List of newly created UserAchievement objects
+    """
+    # Award each achievement once, even if several checks reached it
+    new_achievements = {a.id: a for a in achievements}
+    if not new_achievements:
+        return []
+    
+    earned_at = timezone.now()
+    with transaction.atomic():
+        # Skip rows a concurrent check already inserted, then read back the
+        # ones stamped with this call's time: only those pay their reward
+        UserAchievement.objects.bulk_create([
+            UserAchievement(user=user, achievement=achievement, earned_at=earned_at)
+            for achievement in new_achievements.values()
+        ], ignore_conflicts=True)
+        inserted = {
+            user_achievement.achievement_id: user_achievement
+            for user_achievement in UserAchievement.objects.filter(
+                user=user, achievement_id__in=new_achievements, earned_at=earned_at
+            )
+        }
+        
+        # Award XP and gems, keeping the order the achievements came in
+        user_achievements = []
+        xp_reward = gem_reward = 0
+        for achievement in new_achievements.values():
+            if achievement.id in inserted:
+                user_achievement = inserted[achievement.id]
+                user_achievement.achievement = achievement
+                user_achievements.append(user_achievement)
+                xp_reward += achievement.xp_reward
+                gem_reward += achievement.gem_reward
+        if xp_reward or gem_reward:
+            user.profile.add_rewards(xp=xp_reward, gems=gem_reward)
+    
+    return user_achievements
+
+
 def award_achievement(user, achievement):
     """
     Award an achievement to a user and give them the rewards.
@@ -235,27 +289,16 @@ def award_achievement(user, achievement):
     Returns:
         UserAchievement object if newly created, None if already earned
     """
-    # Check if user already has this achievement
-    existing = UserAchievement.objects.filter(
-        user=user,
-        achievement=achievement
-    ).first()
-    
-    if existing:
-        return None
-    
-    # Create the user achievement
-    user_achievement = UserAchievement.objects.create(
-        user=user,
-        achievement=achievement
+    awarded = award_achievements(user, [achievement])
+    return awarded[0] if awarded else None
+
+
+def _count(queryset):
+    """Number of rows in queryset, as a scalar subquery."""
+    return Subquery(
+        queryset.order_by().annotate(n=Func(F('pk'), function='COUNT')).values('n'),
+        output_field=IntegerField(),
     )
-    
-    # Award XP and gems
-    profile = user.profile
-    profile.add_xp(achievement.xp_reward)
-    profile.add_gems(achievement.gem_reward)
-    
-    return user_achievement
 
 
 def get_achievement_progress(user):
@@ -267,21 +310,16 @@ def get_achievement_progress(user):
     """
     profile = user.profile
     
-    # Completed lessons
-    completed_lessons = LessonProgress.objects.filter(
-        user=user,
-        completed=True
-    ).count()
-    
-    # Completed quests
-    completed_quests = UserDailyQuest.objects.filter(
-        user=user,
-        completed=True
-    ).count()
-    
-    # Earned achievements
-    earned_count = UserAchievement.objects.filter(user=user).count()
-    total_count = Achievement.objects.count()
+    # Earned and total achievements, counted as subqueries of a single
+    # SELECT; completed lessons and quests are kept on the profile
+    counts = UserProfile.objects.filter(pk=profile.pk).annotate(
+        earned_count=_count(UserAchievement.objects.filter(user=OuterRef('user'))),
+        total_count=_count(Achievement.objects.all()),
+    ).values('earned_count', 'total_count').get()
+    completed_lessons = profile.completed_lessons_count
+    completed_quests = profile.completed_quests_count
+    earned_count = counts['earned_count']
+    total_count = counts['total_count']
     
     return {
         'earned_achievements': earned_count,
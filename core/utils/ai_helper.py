@@ -3,14 +3,17 @@ import google.genai as genai
 from google.genai import types
 from django.conf import settings
 from django.core.cache import cache
-import json
+from pydantic import BaseModel
 import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Configure Gemini with new SDK
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+client = genai.Client(
+    api_key=settings.GEMINI_API_KEY,
+    http_options=types.HttpOptions(timeout=settings.GEMINI_TIMEOUT_MS),
+)
 
 # Model configuration for Gemini 2.0 Flash
 MODEL_NAME = 'gemini-2.0-flash-exp'
@@ -22,6 +25,37 @@ GENERATION_CONFIG = types.GenerateContentConfig(
     response_modalities=["TEXT"],
 )
 
+# While one request generates a hint or explanation, others asking for the
+# same cache key get the static fallback straight away instead of calling
+# Gemini too. Translation checks grade answers, so they don't take the lock.
+# The lock lives in the cache, so it only spans workers on a shared cache.
+GENERATION_LOCK_TIMEOUT = 30
+
+
+def claim_generation(cache_key):
+    """Take the generation lock for cache_key; False if another request holds it."""
+    if not settings.SHARED_CACHE:
+        return True
+    return cache.add(f"lock:{cache_key}", 1, GENERATION_LOCK_TIMEOUT)
+
+
+def release_generation(cache_key):
+    """Drop the generation lock taken by claim_generation."""
+    if settings.SHARED_CACHE:
+        cache.delete(f"lock:{cache_key}")
+
+
+class TranslationCheck(BaseModel):
+    """Response schema for check_translation_with_ai."""
+    correct: bool
+    feedback: str
+
+
+class HintItem(BaseModel):
+    """One entry of the generate_batch_hints response schema."""
+    exercise_id: int
+    hint: str
+
 
 def generate_smart_hint(exercise, user_profile=None):
     """
@@ -38,6 +72,12 @@ def generate_smart_hint(exercise, user_profile=None):
         logger.info(f"Hint cache hit for exercise {exercise.id}")
         return cached_hint
     
+    fallback_hint = exercise.hint if exercise.hint else "Think about the context and try again!"
+    
+    # Another request is already generating this hint
+    if not claim_generation(cache_key):
+        return fallback_hint
+    
     try:
         # Build context-aware prompt
         learning_level = "beginner"  # Could be based on user_profile data
@@ -74,7 +114,25 @@ Hint:"""
     except Exception as e:
         logger.error(f"Error generating hint: {e}")
         # Fallback to static hint if available
-        return exercise.hint if exercise.hint else "Think about the context and try again!"
+        return fallback_hint
+    
+    finally:
+        release_generation(cache_key)
+
+
+def normalize_answer(text):
+    """Fold case and collapse whitespace so equivalent answers compare equal."""
+    return " ".join(text.casefold().split())
+
+
+def answer_cache_key(*parts):
+    """
+    Hash of the normalized parts, so answers that differ only in case or
+    spacing share one cached model response.
+    """
+    return hashlib.md5(
+        "\x1f".join(normalize_answer(part) for part in parts).encode()
+    ).hexdigest()
 
 
 def explain_mistake(user_answer, correct_answer, exercise_prompt, exercise_type):
@@ -84,10 +142,7 @@ def explain_mistake(user_answer, correct_answer, exercise_prompt, exercise_type)
     """
     
     # Create cache key based on the mistake pattern
-    cache_key = hashlib.md5(
-        f"{user_answer}:{correct_answer}:{exercise_prompt}".lower().encode()
-    ).hexdigest()
-    cache_key = f"explanation:v2:{cache_key}"
+    cache_key = f"explanation:v3:{answer_cache_key(user_answer, correct_answer, exercise_prompt)}"
     
     # Check cache first
     cached_explanation = cache.get(cache_key)
@@ -95,6 +150,12 @@ def explain_mistake(user_answer, correct_answer, exercise_prompt, exercise_type)
         logger.info(f"Explanation cache hit")
         return cached_explanation
     
+    fallback_explanation = f"The correct answer is '{correct_answer}'. Keep practicing!"
+    
+    # Another request is already explaining this mistake
+    if not claim_generation(cache_key):
+        return fallback_explanation
+    
     try:
         prompt = f"""You are a patient language teacher. A student made a mistake.
 
@@ -130,7 +191,10 @@ Explanation:"""
     except Exception as e:
         logger.error(f"Error generating explanation: {e}")
         # Fallback explanation
-        return f"The correct answer is '{correct_answer}'. Keep practicing!"
+        return fallback_explanation
+    
+    finally:
+        release_generation(cache_key)
 
 
 def check_translation_with_ai(user_answer, correct_answer, original_phrase):
@@ -139,11 +203,15 @@ def check_translation_with_ai(user_answer, correct_answer, original_phrase):
     Returns dict with 'correct' (bool) and 'feedback' (str).
     """
     
+    # The expected answer itself needs no model call
+    if normalize_answer(user_answer) == normalize_answer(correct_answer):
+        return {
+            "correct": True,
+            "feedback": "Matches the expected answer."
+        }
+    
     # Create cache key
-    cache_key = hashlib.md5(
-        f"{user_answer}:{correct_answer}:{original_phrase}".lower().encode()
-    ).hexdigest()
-    cache_key = f"trans_check:v2:{cache_key}"
+    cache_key = f"trans_check:v3:{answer_cache_key(user_answer, correct_answer, original_phrase)}"
     
     # Check cache
     cached = cache.get(cache_key)
@@ -151,6 +219,9 @@ def check_translation_with_ai(user_answer, correct_answer, original_phrase):
         logger.info(f"Translation check cache hit")
         return cached
     
+    # No generation lock here: its fallback would be the exact-match check,
+    # which can only reject at this point, so a correct answer would be
+    # marked wrong just because another request was checking it too
     try:
         prompt = f"""Check this translation:
 
@@ -163,10 +234,10 @@ Is the student's translation acceptable? Consider:
 - Common alternative translations
 - Minor grammar/spelling differences
 
-Respond in JSON format only:
-{{"correct": true/false, "feedback": "brief reason in 1 sentence"}}"""
+Give a brief reason in 1 sentence as the feedback."""
 
-        # Use new SDK with Gemini 2.0 Flash - optimized for JSON
+        # Use new SDK with Gemini 2.0 Flash - the response schema makes the
+        # SDK return an already validated TranslationCheck
         response = client.models.generate_content(
             model=MODEL_NAME,
             contents=prompt,
@@ -174,23 +245,16 @@ Respond in JSON format only:
                 temperature=0.1,  # Lower temp for more consistent JSON
                 max_output_tokens=100,
                 response_modalities=["TEXT"],
-                response_mime_type="application/json",  # Request JSON response
+                response_mime_type="application/json",
+                response_schema=TranslationCheck,
             ),
         )
         
-        # Parse JSON response
-        result = json.loads(response.text.strip())
-        
-        # Validate response structure
-        if not isinstance(result, dict) or 'correct' not in result:
+        # None when the output did not match the schema
+        if response.parsed is None:
             raise ValueError("Invalid response structure")
         
-        # Ensure correct is boolean
-        result['correct'] = bool(result.get('correct', False))
-        
-        # Ensure feedback exists
-        if 'feedback' not in result:
-            result['feedback'] = "Checked against expected answer."
+        result = response.parsed.model_dump()
         
         # Cache for 30 days
         cache.set(cache_key, result, 60*60*24*30)
@@ -201,7 +265,7 @@ Respond in JSON format only:
     except Exception as e:
         logger.error(f"Error checking translation: {e}")
         # Fallback to exact match
-        is_correct = user_answer.lower().strip() == correct_answer.lower().strip()
+        is_correct = normalize_answer(user_answer) == normalize_answer(correct_answer)
         return {
             "correct": is_correct,
             "feedback": "Checked against expected answer."
@@ -217,10 +281,11 @@ def generate_batch_hints(exercises, user_profile=None):
     uncached_exercises = []
     results = {}
     
-    # Check cache first
-    for exercise in exercises:
-        cache_key = f"hint:v2:{exercise.id}"
-        cached = cache.get(cache_key)
+    # Check cache first, fetching every key in one round trip
+    cache_keys = {f"hint:v2:{exercise.id}": exercise for exercise in exercises}
+    cached_hints = cache.get_many(cache_keys)
+    for cache_key, exercise in cache_keys.items():
+        cached = cached_hints.get(cache_key)
         if cached:
             results[exercise.id] = cached
         else:
@@ -243,7 +308,10 @@ Generate a brief helpful hint (2-3 sentences, don't give away answer):"""
         
         # Combine prompts
         combined_prompt = "\n\n---\n\n".join(batch_prompts)
+        combined_prompt += "\n\nReturn one hint per exercise, tagged with its exercise id."
         
+        # The response schema makes the SDK return a list of HintItems, so
+        # hints are matched to exercises by id rather than by position
         response = client.models.generate_content(
             model=MODEL_NAME,
             contents=combined_prompt,
@@ -251,18 +319,29 @@ Generate a brief helpful hint (2-3 sentences, don't give away answer):"""
                 temperature=0.3,
                 max_output_tokens=500,
                 response_modalities=["TEXT"],
+                response_mime_type="application/json",
+                response_schema=list[HintItem],
             ),
         )
         
-        # Parse response (split by exercise)
-        hints = response.text.split("---")
+        if response.parsed is None:
+            raise ValueError("Invalid response structure")
         
-        for i, exercise in enumerate(uncached_exercises):
-            if i < len(hints):
-                hint = hints[i].strip()
-                results[exercise.id] = hint
-                cache_key = f"hint:v2:{exercise.id}"
-                cache.set(cache_key, hint, 60*60*24*7)
+        pending = {exercise.id: exercise for exercise in uncached_exercises}
+        new_hints = {}
+        for item in response.parsed:
+            hint = item.hint.strip()
+            if item.exercise_id in pending and hint:
+                del pending[item.exercise_id]
+                results[item.exercise_id] = hint
+                new_hints[f"hint:v2:{item.exercise_id}"] = hint
+        
+        # Cache for 7 days, written in one round trip
+        cache.set_many(new_hints, 60*60*24*7)
+        
+        # Exercises the model skipped get individual hints
+        for exercise in pending.values():
+            results[exercise.id] = generate_smart_hint(exercise, user_profile)
         
         return results
         
@@ -270,7 +349,8 @@ Generate a brief helpful hint (2-3 sentences, don't give away answer):"""
         logger.error(f"Error in batch hint generation: {e}")
         # Fallback to individual hints
         for exercise in uncached_exercises:
-            results[exercise.id] = generate_smart_hint(exercise, user_profile)
+            if exercise.id not in results:
+                results[exercise.id] = generate_smart_hint(exercise, user_profile)
         return results
 
 
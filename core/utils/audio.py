@@ -0,0 +1,45 @@
+# core/utils/audio.py
+from django.conf import settings
+from gtts import gTTS
+import hashlib
+import os
+import tempfile
+
+# Shared MP3s live here, named by a hash of their language and text
+AUDIO_CACHE_DIR = 'exercise_audio/_cache'
+
+
+def audio_cache_name(text, lang):
+    """Storage name of the shared MP3 for text spoken in lang."""
+    digest = hashlib.sha1(f'{lang}|{text}'.encode()).hexdigest()
+    return f'{AUDIO_CACHE_DIR}/{digest}.mp3'
+
+
+def synthesize(text, lang, regenerate=False):
+    """
+    Make sure the shared MP3 for text exists, calling Google TTS only when it
+    is missing (or regenerate is set). Exercises with the same text and
+    language share one file.
+
+    Returns:
+        Storage name to assign to a FileField
+    """
+    name = audio_cache_name(text, lang)
+    path = os.path.join(settings.MEDIA_ROOT, name)
+
+    if regenerate or not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and move it into place, so a failed
+        # request never leaves a partial MP3 that later runs would reuse
+        fd, pending_path = tempfile.mkstemp(suffix='.part', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            tts = gTTS(text=text, lang=lang, slow=False)
+            tts.save(pending_path)
+            os.replace(pending_path, path)
+        except Exception:
+            os.unlink(pending_path)
+            raise
+
+    return name
@@ -0,0 +1,142 @@
+# core/utils/seed.py
+from django.db import connection
+from core.models import Section, Unit, Lesson, Exercise, ExerciseChoice
+
+
+def seed_outline(course, sections_data):
+    """
+    Upsert a course outline (sections -> units -> lessons -> exercises ->
+    choices) one level at a time, keyed on each row's parent and order.
+    Reruns refresh existing rows to match the seed data.
+
+    Args:
+        course: Course the outline belongs to
+        sections_data: List of section dicts (order, title, description,
+            units), each unit a dict (order, title, description, lessons),
+            each lesson a dict (order, title, lesson_type, is_locked,
+            exercises) and each exercise a dict of Exercise fields plus an
+            optional list of choices ({'text', 'is_correct'})
+    """
+    sections = _upsert(Section, [
+        Section(
+            course=course,
+            order=section_data['order'],
+            title=section_data['title'],
+            description=section_data['description'],
+        )
+        for section_data in sections_data
+    ], ['course', 'order'], ['title', 'description'])
+
+    # Pair every unit with its section
+    unit_specs = [
+        (section, unit_data)
+        for section, section_data in zip(sections, sections_data)
+        for unit_data in section_data['units']
+    ]
+    units = _upsert(Unit, [
+        Unit(
+            section=section,
+            order=unit_data['order'],
+            title=unit_data['title'],
+            description=unit_data['description'],
+        )
+        for section, unit_data in unit_specs
+    ], ['section', 'order'], ['title', 'description'])
+
+    # Pair every lesson with its unit
+    lesson_specs = [
+        (unit, lesson_data)
+        for unit, (section, unit_data) in zip(units, unit_specs)
+        for lesson_data in unit_data['lessons']
+    ]
+    lessons = _upsert(Lesson, [
+        Lesson(
+            unit=unit,
+            order=lesson_data['order'],
+            title=lesson_data['title'],
+            lesson_type=lesson_data['lesson_type'],
+            is_locked=lesson_data['is_locked'],
+        )
+        for unit, lesson_data in lesson_specs
+    ], ['unit', 'order'], ['title', 'lesson_type', 'is_locked'])
+
+    # Pair every exercise with its lesson
+    exercise_specs = [
+        (lesson, ex_data)
+        for lesson, (unit, lesson_data) in zip(lessons, lesson_specs)
+        for ex_data in lesson_data['exercises']
+    ]
+    exercises = _upsert(Exercise, [
+        Exercise(
+            lesson=lesson,
+            order=ex_data['order'],
+            type=ex_data['type'],
+            prompt=ex_data['prompt'],
+            answer_text=ex_data['answer_text'],
+            is_new_word=ex_data.get('is_new_word', False),
+            hint=ex_data.get('hint', ''),
+        )
+        for lesson, ex_data in exercise_specs
+    ], ['lesson', 'order'], ['type', 'prompt', 'answer_text', 'is_new_word', 'hint'])
+
+    # Choices have no unique key (listen-and-construct word banks may
+    # repeat a word), so dedupe on (exercise, text) here: against rows
+    # already stored and within this run, as get_or_create used to
+    seen_choices = set(
+        ExerciseChoice.objects.filter(
+            exercise__lesson__unit__section__course=course
+        ).values_list('exercise_id', 'text')
+    )
+    choices = []
+    for exercise, (lesson, ex_data) in zip(exercises, exercise_specs):
+        for choice_data in ex_data.get('choices', []):
+            key = (exercise.pk, choice_data['text'])
+            if key in seen_choices:
+                continue
+            seen_choices.add(key)
+            choices.append(ExerciseChoice(
+                exercise_id=exercise.pk,
+                text=choice_data['text'],
+                is_correct=choice_data['is_correct'],
+            ))
+    ExerciseChoice.objects.bulk_create(choices)
+
+
+def _upsert(model, objs, unique_fields, update_fields):
+    """
+    Insert objs, or update update_fields on rows that already match their
+    unique_fields. Returns objs with primary keys set, in the same order.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        # One INSERT ... ON CONFLICT DO UPDATE that also returns the keys
+        return model.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+
+    # Backends that can't return keys from a bulk insert: look up the
+    # existing rows with one SELECT, update those and insert the rest
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    parents = {f'{attnames[0]}__in': {getattr(obj, attnames[0]) for obj in objs}}
+
+    def existing_keys():
+        return {
+            tuple(row[1:]): row[0]
+            for row in model.objects.filter(**parents).values_list('pk', *attnames)
+        }
+
+    existing = existing_keys()
+    to_update, to_create = [], []
+    for obj in objs:
+        obj.pk = existing.get(tuple(getattr(obj, name) for name in attnames))
+        (to_update if obj.pk else to_create).append(obj)
+
+    model.objects.bulk_update(to_update, update_fields)
+    if to_create:
+        model.objects.bulk_create(to_create)
+        created = existing_keys()
+        for obj in to_create:
+            obj.pk = created[tuple(getattr(obj, name) for name in attnames)]
+    return objs
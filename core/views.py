@@ -1,7 +1,8 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Prefetch
 from datetime import date, time, timedelta
 from django.http import JsonResponse
 from .models import (
@@ -9,9 +10,34 @@ from .models import (
     Attempt, LessonProgress, UserProfile, DailyQuest,
     UserDailyQuest, Achievement, UserAchievement
 )
-from .utils.ai_helper import generate_smart_hint, explain_mistake, check_translation_with_ai
+from .utils.ai_helper import (
+    generate_smart_hint, explain_mistake, check_translation_with_ai, normalize_answer
+)
 from .utils.achievements import check_and_award_achievements, get_achievement_progress
 
+# Course each learning language starts on
+LANGUAGE_TO_SLUG = {
+    UserProfile.SPANISH: 'spanish-to-english',
+    UserProfile.CHINESE: 'chinese-to-english',
+    UserProfile.FRENCH: 'french-to-english',
+}
+
+# Learning language a course sets when the user opens it
+SLUG_TO_LANGUAGE = {
+    'spanish-to-english': UserProfile.SPANISH,
+    'chinese-to-english': UserProfile.CHINESE,
+    'zh-en-basics': UserProfile.CHINESE,
+    'french-to-english': UserProfile.FRENCH,
+}
+
+VALID_LANGUAGE_CODES = frozenset(code for code, _ in UserProfile.LANGUAGE_CHOICES)
+
+# Languages offered on the language selection page
+SELECTABLE_LANGUAGES = (
+    {"code": UserProfile.SPANISH, "name": "Spanish", "flag": "🇪🇸", "native_name": "Español"},
+    {"code": UserProfile.CHINESE, "name": "Chinese", "flag": "🇨🇳", "native_name": "中文"},
+)
+
 def restore_hearts_if_needed(profile):
     """
     Restore hearts to maximum if it's a new day since last heart restoration.
@@ -36,13 +62,97 @@ def restore_hearts_if_needed(profile):
         # First time, ensure hearts are at max
         profile.restore_hearts()
 
+def get_or_create_profile(user):
+    """
+    The user's profile, creating it on their first visit. The session user
+    is loaded together with its profile, so this usually needs no query.
+    """
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        return UserProfile.objects.get_or_create(user=user)[0]
+
+@transaction.atomic
+def finalize_lesson(user, profile, lesson, score, perfect):
+    """
+    Record a finished lesson and apply its rewards: lesson progress, the
+    completion XP, quest progress and achievements. All of the writes commit
+    together, so a failure part way never leaves half-applied rewards.
+
+    Returns:
+        XP awarded for completing the lesson; 0 if it was already completed,
+        e.g. by a double-submitted request
+    """
+    now = timezone.now()
+    try:
+        # First completion: a plain INSERT, in a savepoint so a clash on the
+        # (user, lesson) unique constraint leaves the transaction usable
+        with transaction.atomic():
+            LessonProgress.objects.create(
+                user=user, lesson=lesson, score=score, completed=True, last_seen=now
+            )
+    except IntegrityError:
+        # A progress row exists; only the request that flips it from not
+        # completed to completed goes on to pay the rewards
+        newly_completed = LessonProgress.objects.filter(
+            user=user, lesson=lesson, completed=False
+        ).update(score=score, completed=True, last_seen=now)
+        if not newly_completed:
+            return 0
+
+    # Award completion bonus XP and count the lesson, which this call just
+    # completed
+    completion_xp = 20
+    profile.add_rewards(xp=completion_xp, completed_lessons=1)
+
+    # Update daily quest progress
+    today = date.today()
+    
+    # Update the XP and lessons quests, plus the perfect lesson quest when
+    # every exercise was right on the first try, in one UPDATE
+    increments = {
+        DailyQuest.EARN_XP: completion_xp,
+        DailyQuest.COMPLETE_LESSONS: 1,
+    }
+    if perfect:
+        increments[DailyQuest.PERFECT_LESSON] = 1
+    UserDailyQuest.bulk_increment(user, increments, date_assigned=today)
+    
+    week_num = today.isocalendar()[1]
+    year_num = today.year
+    
+    # Weekly Warrior quest (7 perfect lessons in a week)
+    if perfect:
+        UserDailyQuest.bulk_increment(
+            user, {DailyQuest.WEEKLY_WARRIOR: 1},
+            week_assigned=week_num, year_assigned=year_num
+        )
+    
+    # Streak Master quest (maintain 7-day streak)
+    if profile.streak_days >= 7:
+        streak_master = UserDailyQuest.objects.filter(
+            user=user,
+            quest__quest_type=DailyQuest.STREAK_MASTER,
+            week_assigned=week_num,
+            year_assigned=year_num
+        ).first()
+        if streak_master and not streak_master.completed:
+            streak_master.progress = profile.streak_days
+            streak_master.update_progress(0)  # Just check completion
+
+        check_and_award_achievements(
+            user, achievement_type=['lesson', 'xp', 'quest', 'time']
+        )
+
+    return completion_xp
+
 def home(request):
     # Show onboarding page for non-logged-in users
     if not request.user.is_authenticated:
         return render(request, "onboarding.html")
 
     # Check if user has selected a language, if not redirect to language selection
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = get_or_create_profile(request.user)
     
     # Restore hearts if needed
     restore_hearts_if_needed(profile)
@@ -53,12 +163,7 @@ def home(request):
     # Redirect to the course detail page for their learning language
     if profile.learning_language:
         # Map learning language to course slug
-        language_map = {
-            'es': 'spanish-to-english',
-            'zh': 'chinese-to-english',
-            'fr': 'french-to-english',
-        }
-        course_slug = language_map.get(profile.learning_language)
+        course_slug = LANGUAGE_TO_SLUG.get(profile.learning_language)
         if course_slug:
             return redirect("course_detail", slug=course_slug)
     
@@ -77,7 +182,23 @@ def course_list(request):
 
 def course_detail(request, slug):
     course = get_object_or_404(Course, slug=slug)
-    sections = course.sections.all().prefetch_related("units__lessons")
+    # Only the columns the course path template shows
+    lessons = Lesson.objects.only(
+        "id", "unit_id", "order", "title", "lesson_type", "is_locked"
+    )
+    if request.user.is_authenticated:
+        # Attach the user's progress to each lesson as lesson.user_progress
+        lessons = lessons.prefetch_related(Prefetch(
+            "lessonprogress_set",
+            queryset=LessonProgress.objects.filter(user=request.user),
+            to_attr="user_progress",
+        ))
+    sections = course.sections.only("id", "course_id", "order").prefetch_related(
+        Prefetch("units", queryset=Unit.objects.only(
+            "id", "section_id", "order", "title", "description"
+        )),
+        Prefetch("units__lessons", queryset=lessons),
+    )
 
     # Update user's learning language based on course they're viewing
     if request.user.is_authenticated:
@@ -87,43 +208,32 @@ def course_detail(request, slug):
         restore_hearts_if_needed(profile)
         
         # Map course slug to language code
-        slug_to_language = {
-            'spanish-to-english': 'es',
-            'chinese-to-english': 'zh',
-            'zh-en-basics': 'zh',
-            'french-to-english': 'fr',
-        }
-        
-        course_language = slug_to_language.get(slug)
+        course_language = SLUG_TO_LANGUAGE.get(slug)
         if course_language and profile.learning_language != course_language:
             profile.learning_language = course_language
             profile.has_selected_language = True
-            profile.save()
-
-        # Get progress map
-        all_lessons = Lesson.objects.filter(unit__section__course=course)
-        progress_map = {lp.lesson_id: lp for lp in LessonProgress.objects.filter(user=request.user, lesson__in=all_lessons)}
+            profile.save(update_fields=["learning_language", "has_selected_language"])
 
         # Get or create daily quests for today
         today = date.today()
-        daily_quests = UserDailyQuest.objects.filter(user=request.user, date_assigned=today)
+        daily_quests = list(UserDailyQuest.objects.filter(
+            user=request.user, date_assigned=today
+        ).select_related("quest"))
         
-        # If no quests exist for today, create them
-        if not daily_quests.exists():
+        # If no quests exist for today, create them and show the new rows
+        # as built, without reading them back
+        if not daily_quests:
             active_quests = DailyQuest.objects.filter(is_active=True)
-            for quest in active_quests:
-                UserDailyQuest.objects.create(
-                    user=request.user,
-                    quest=quest,
-                    date_assigned=today
-                )
-            daily_quests = UserDailyQuest.objects.filter(user=request.user, date_assigned=today)
+            daily_quests = UserDailyQuest.objects.bulk_create(
+                [
+                    UserDailyQuest(user=request.user, quest=quest, date_assigned=today)
+                    for quest in active_quests
+                ],
+                ignore_conflicts=True,
+            )
         
         # Check if leaderboards are unlocked (need to complete a certain number of lessons)
-        completed_lessons_count = LessonProgress.objects.filter(
-            user=request.user,
-            completed=True
-        ).count()
+        completed_lessons_count = profile.completed_lessons_count
         
         lessons_needed = max(0, 10 - completed_lessons_count)
         is_unlocked = completed_lessons_count >= 10
@@ -131,14 +241,13 @@ def course_detail(request, slug):
         return render(request, "course_detail.html", {
             "course": course,
             "sections": sections,
-            "progress_map": progress_map,
             "profile": profile,
             "daily_quests": daily_quests,
             "lessons_needed": lessons_needed,
             "is_unlocked": is_unlocked,
         })
 
-    return render(request, "course_detail.html", {"course": course, "sections": sections, "progress_map": {}})
+    return render(request, "course_detail.html", {"course": course, "sections": sections})
 
 @login_required
 def lesson_start(request, lesson_id):
@@ -153,8 +262,7 @@ def lesson_start(request, lesson_id):
         if str(lesson_id) in request.session['lesson_attempts']:
             del request.session['lesson_attempts'][str(lesson_id)]
     
-    exercises = list(lesson.exercises.all().order_by("order"))
-    if not exercises:
+    if not lesson.exercises.exists():
         return render(request, "lesson_empty.html", {"lesson": lesson})
     # start at first exercise index = 1
     return redirect("exercise_play", lesson_id=lesson.id, index=1)
@@ -162,6 +270,10 @@ def lesson_start(request, lesson_id):
 @login_required
 def exercise_play(request, lesson_id, index: int):
     lesson = get_object_or_404(Lesson, pk=lesson_id)
+    # Sort on order alone: the default (lesson, order) ordering joins
+    # core_lesson to sort by the lesson's own order, while filtering on
+    # lesson_id and sorting by order is served by the unique (lesson, order)
+    # index
     exercises = list(lesson.exercises.all().order_by("order"))
     profile = request.user.profile
 
@@ -184,6 +296,8 @@ def exercise_play(request, lesson_id, index: int):
         return redirect("lesson_complete", lesson_id=lesson.id)
 
     exercise = exercises[index-1]
+    # Load the choices once; the template reads them several times
+    choices = list(exercise.choices.all())
     
     # Initialize session storage for tracking attempts
     if 'lesson_attempts' not in request.session:
@@ -217,9 +331,10 @@ def exercise_play(request, lesson_id, index: int):
         if exercise.type == Exercise.MULTIPLE_CHOICE:
             choice_id = request.POST.get("choice")
             if choice_id:
-                selected_choice = ExerciseChoice.objects.filter(pk=choice_id, exercise=exercise).first()
+                user_choice_id = int(choice_id)
+                # Look the answer up among the choices already loaded for the page
+                selected_choice = next((c for c in choices if c.pk == user_choice_id), None)
                 is_correct = bool(selected_choice and selected_choice.is_correct)
-                user_choice_id = int(choice_id) if choice_id else None
         else:  # TRANSLATE or other text-based exercises
             # Use AI to check translation with fallback to exact match
             if exercise.type == Exercise.TRANSLATE:
@@ -237,11 +352,11 @@ def exercise_play(request, lesson_id, index: int):
                     import logging
                     logger = logging.getLogger(__name__)
                     logger.error(f"AI translation check failed: {e}")
-                    is_correct = submitted_text.lower() == exercise.answer_text.strip().lower()
+                    is_correct = normalize_answer(submitted_text) == normalize_answer(exercise.answer_text)
                     ai_feedback = None
             else:
                 # Simple exact match for non-translation exercises
-                is_correct = submitted_text.lower() == exercise.answer_text.strip().lower()
+                is_correct = normalize_answer(submitted_text) == normalize_answer(exercise.answer_text)
                 ai_feedback = None
 
         # Record the attempt in database (EXISTING LOGIC - UNCHANGED)
@@ -276,14 +391,10 @@ def exercise_play(request, lesson_id, index: int):
             # Update XP quest progress (EXISTING LOGIC - UNCHANGED)
             if not is_practice_mode:
                 today = date.today()
-                xp_quest = UserDailyQuest.objects.filter(
-                    user=request.user,
-                    quest__quest_type=DailyQuest.EARN_XP,
-                    date_assigned=today
-                ).first()
-                if xp_quest:
-                    xp_reward = 10 if attempt_count == 1 else 5
-                    xp_quest.update_progress(xp_reward)
+                xp_reward = 10 if attempt_count == 1 else 5
+                UserDailyQuest.bulk_increment(
+                    request.user, {DailyQuest.EARN_XP: xp_reward}, date_assigned=today
+                )
             
             # Update streak (EXISTING LOGIC - UNCHANGED)
             profile.update_streak()
@@ -370,6 +481,7 @@ def exercise_play(request, lesson_id, index: int):
     return render(request, "exercise.html", {
         "lesson": lesson,
         "exercise": exercise,
+        "choices": choices,
         "index": index,
         "total": len(exercises),
         "feedback": feedback,
@@ -382,7 +494,7 @@ def exercise_play(request, lesson_id, index: int):
 @login_required
 def lesson_complete(request, lesson_id):
     lesson = get_object_or_404(Lesson, pk=lesson_id)
-    exercises = list(lesson.exercises.all())
+    total_exercises = lesson.exercises.count()
     profile = request.user.profile
 
     # Restore hearts if needed
@@ -402,84 +514,15 @@ def lesson_complete(request, lesson_id):
     failed_count = sum(1 for v in attempts_data.values() if v == 'failed')
     
     total_correct = perfect_count + corrected_count
-    total_exercises = len(exercises)
     
     # Calculate score
     score = total_correct
 
     # Only update progress and award XP if NOT in practice mode
     if not is_practice_mode:
-        lp, _ = LessonProgress.objects.get_or_create(user=request.user, lesson=lesson)
-        lp.score = score
-        lp.completed = True
-        lp.last_seen = timezone.now()
-        lp.save()
-
-        # Award completion bonus XP
-        completion_xp = 20
-        profile.add_xp(completion_xp)
-
-        # Update daily quest progress
-        today = date.today()
-        
-        # Update XP quest
-        xp_quest = UserDailyQuest.objects.filter(
-            user=request.user,
-            quest__quest_type=DailyQuest.EARN_XP,
-            date_assigned=today
-        ).first()
-        if xp_quest:
-            xp_quest.update_progress(completion_xp)
-        
-        # Update lessons quest
-        lesson_quest = UserDailyQuest.objects.filter(
-            user=request.user,
-            quest__quest_type=DailyQuest.COMPLETE_LESSONS,
-            date_assigned=today
-        ).first()
-        if lesson_quest:
-            lesson_quest.update_progress(1)
-
-        # Check for perfect lesson (all correct on first try)
-        if perfect_count == total_exercises:
-            perfect_quest = UserDailyQuest.objects.filter(
-                user=request.user,
-                quest__quest_type=DailyQuest.PERFECT_LESSON,
-                date_assigned=today
-            ).first()
-            if perfect_quest:
-                perfect_quest.update_progress(1)
-        
-        week_num = today.isocalendar()[1]
-        year_num = today.year
-        
-        # Weekly Warrior quest (7 perfect lessons in a week)
-        if perfect_count == total_exercises:
-            weekly_warrior = UserDailyQuest.objects.filter(
-                user=request.user,
-                quest__quest_type=DailyQuest.WEEKLY_WARRIOR,
-                week_assigned=week_num,
-                year_assigned=year_num
-            ).first()
-            if weekly_warrior:
-                weekly_warrior.update_progress(1)
-        
-        # Streak Master quest (maintain 7-day streak)
-        if profile.streak_days >= 7:
-            streak_master = UserDailyQuest.objects.filter(
-                user=request.user,
-                quest__quest_type=DailyQuest.STREAK_MASTER,
-                week_assigned=week_num,
-                year_assigned=year_num
-            ).first()
-            if streak_master and not streak_master.completed:
-                streak_master.progress = profile.streak_days
-                streak_master.update_progress(0)  # Just check completion
-
-            check_and_award_achievements(request.user, achievement_type='lesson')
-            check_and_award_achievements(request.user, achievement_type='xp')
-            check_and_award_achievements(request.user, achievement_type='quest')
-            check_and_award_achievements(request.user, achievement_type='time')
+        completion_xp = finalize_lesson(
+            request.user, profile, lesson, score, perfect_count == total_exercises
+        )
     else:
         # Practice mode - just update last_seen
         if lesson_progress:
@@ -506,7 +549,7 @@ def lesson_complete(request, lesson_id):
 
 @login_required
 def language_selection(request):
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    profile = get_or_create_profile(request.user)
 
     # If user has already selected a language, redirect to home
     if profile.has_selected_language:
@@ -514,18 +557,13 @@ def language_selection(request):
 
     if request.method == "POST":
         language = request.POST.get("language")
-        if language in dict(UserProfile.LANGUAGE_CHOICES):
+        if language in VALID_LANGUAGE_CODES:
             profile.learning_language = language
             profile.has_selected_language = True
-            profile.save()
+            profile.save(update_fields=["learning_language", "has_selected_language"])
             return redirect("home")
 
-    languages = [
-        {"code": UserProfile.SPANISH, "name": "Spanish", "flag": "🇪🇸", "native_name": "Español"},
-        {"code": UserProfile.CHINESE, "name": "Chinese", "flag": "🇨🇳", "native_name": "中文"},
-    ]
-
-    return render(request, "language_selection.html", {"languages": languages})
+    return render(request, "language_selection.html", {"languages": SELECTABLE_LANGUAGES})
 
 @login_required
 def user_profile(request):
@@ -535,14 +573,9 @@ def user_profile(request):
     # Restore hearts if needed
     restore_hearts_if_needed(profile)
     
-    # Get user statistics
-    total_lessons_completed = LessonProgress.objects.filter(
-        user=request.user,
-        completed=True
-    ).count()
-    
-    # Get achievement progress
+    # Get achievement progress, which includes the user statistics
     achievement_progress = get_achievement_progress(request.user)
+    total_lessons_completed = achievement_progress['stats']['completed_lessons']
     
     # Get recent achievements (last 6 earned)
     recent_achievements = UserAchievement.objects.filter(
@@ -576,52 +609,48 @@ def quests(request):
     
     today = date.today()
     
-    # Get or create today's daily quests
-    daily_quests = UserDailyQuest.objects.filter(
+    # Get or create today's daily quests; new rows are shown as built,
+    # without reading them back
+    daily_quests = list(UserDailyQuest.objects.filter(
         user=request.user, 
         date_assigned=today,
         quest__is_weekly=False  # NEW: Only daily quests
-    )
+    ).select_related("quest"))
     
-    if not daily_quests.exists():
+    if not daily_quests:
         active_daily_quests = DailyQuest.objects.filter(is_active=True, is_weekly=False)
-        for quest in active_daily_quests:
-            UserDailyQuest.objects.create(
-                user=request.user,
-                quest=quest,
-                date_assigned=today
-            )
-        daily_quests = UserDailyQuest.objects.filter(
-            user=request.user, 
-            date_assigned=today,
-            quest__is_weekly=False
+        daily_quests = UserDailyQuest.objects.bulk_create(
+            [
+                UserDailyQuest(user=request.user, quest=quest, date_assigned=today)
+                for quest in active_daily_quests
+            ],
+            ignore_conflicts=True,
         )
     
     # NEW: Get or create weekly quests
     week_num = today.isocalendar()[1]
     year_num = today.year
     
-    weekly_quests = UserDailyQuest.objects.filter(
+    weekly_quests = list(UserDailyQuest.objects.filter(
         user=request.user,
         week_assigned=week_num,
         year_assigned=year_num,
         quest__is_weekly=True
-    )
+    ).select_related("quest"))
     
-    if not weekly_quests.exists():
+    if not weekly_quests:
         active_weekly_quests = DailyQuest.objects.filter(is_active=True, is_weekly=True)
-        for quest in active_weekly_quests:
-            UserDailyQuest.objects.create(
-                user=request.user,
-                quest=quest,
-                week_assigned=week_num,
-                year_assigned=year_num
-            )
-        weekly_quests = UserDailyQuest.objects.filter(
-            user=request.user,
-            week_assigned=week_num,
-            year_assigned=year_num,
-            quest__is_weekly=True
+        weekly_quests = UserDailyQuest.objects.bulk_create(
+            [
+                UserDailyQuest(
+                    user=request.user,
+                    quest=quest,
+                    week_assigned=week_num,
+                    year_assigned=year_num
+                )
+                for quest in active_weekly_quests
+            ],
+            ignore_conflicts=True,
         )
     
     # Calculate time remaining
@@ -653,10 +682,7 @@ def leaderboards(request):
     restore_hearts_if_needed(profile)
     
     # Check if leaderboards are unlocked (need to complete a certain number of lessons)
-    completed_lessons_count = LessonProgress.objects.filter(
-        user=request.user,
-        completed=True
-    ).count()
+    completed_lessons_count = profile.completed_lessons_count
     
     lessons_needed = max(0, 10 - completed_lessons_count)
     is_unlocked = completed_lessons_count >= 10
@@ -682,16 +708,13 @@ def shop(request):
         
         if item_type == 'refill_hearts':
             cost = 350
-            if profile.gems >= cost:
-                profile.gems -= cost
+            if profile.spend_gems(cost):
                 profile.restore_hearts()
                 return redirect('shop')
         elif item_type == 'streak_freeze':
             cost = 200
-            if profile.gems >= cost:
+            if profile.spend_gems(cost):
                 # TODO: Implement streak freeze functionality
-                profile.gems -= cost
-                profile.save()
                 return redirect('shop')
     
     # Get or create today's daily quests for the sidebar